@@ -1,3 +1,4 @@
 from pws.asymmetric.rsa.keys import RSAPublicKey, RSAPrivateKey, RSAKeyPair
 from pws.asymmetric.rsa.keygen import generate_keypair
+from pws.asymmetric.rsa.batchgcd import batch_gcd, shared_factors
 from pws.asymmetric.rsa.error import *
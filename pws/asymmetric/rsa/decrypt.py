@@ -6,7 +6,9 @@ from pws.asymmetric.rsa.pad import unpad_pkcs1_v1_5, unpad_oaep
 
 from pws.asymmetric.rsa.error import RSADecryptionException
 
-from pws.math import int_pow
+from pws.hash import SHA1
+
+from pws.asymmetric.rsa.helpers import mod_pow, crt_pow
 
 def decrypt(c_: AbstractText, d: int, n: int, pad_type: Optional[str]="pkcs1", **kwargs) -> AbstractText:
     
@@ -18,12 +20,15 @@ def decrypt(c_: AbstractText, d: int, n: int, pad_type: Optional[str]="pkcs1", *
     else:
         c = c_
 
-    m = int_pow(c, d, n)
+    if kwargs.get("crt_context") is not None:
+        m = crt_pow(c, d, kwargs["crt_context"])
+    else:
+        m = mod_pow(c, d, n, kwargs.get("mod_context"))
  
     unpad_function = {
 
         "pkcs1": unpad_pkcs1_v1_5,
-        "oaep": lambda x: unpad_oaep(x, n_size=byte_length(n), label=kwargs.get("oaep_label", b"")),
+        "oaep": lambda x: unpad_oaep(x, n_size=byte_length(n), label=kwargs.get("oaep_label", b""), hash_func=kwargs.get("hash_func", SHA1), mgf=kwargs.get("mgf")),
         "none": lambda x: x,
         None  : lambda x: x
     }[pad_type]
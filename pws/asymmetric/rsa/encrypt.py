@@ -5,7 +5,9 @@ from pws.asymmetric.rsa.pad import pad_pkcs1_v1_5, pad_oaep
 
 from pws.asymmetric.rsa.error import RSAEncryptionException
 
-from pws.math import int_pow
+from pws.hash import SHA1
+
+from pws.asymmetric.rsa.helpers import mod_pow
 
 def encrypt(m_: AbstractText, e: int, n: int, pad_type: Optional[str]="pkcs1", **kwargs) -> AbstractText:
     
@@ -14,7 +16,7 @@ def encrypt(m_: AbstractText, e: int, n: int, pad_type: Optional[str]="pkcs1", *
     
     pad_function = {
         "pkcs1": pad_pkcs1_v1_5,
-        "oaep":  lambda x: pad_oaep(x, n_size=byte_length(n), label=kwargs.get("oaep_label", b"")),
+        "oaep":  lambda x: pad_oaep(x, n_size=byte_length(n), label=kwargs.get("oaep_label", b""), hash_func=kwargs.get("hash_func", SHA1), mgf=kwargs.get("mgf")),
         "none":  lambda x: x,
         None  :  lambda x: x
     }[pad_type]
@@ -28,7 +30,7 @@ def encrypt(m_: AbstractText, e: int, n: int, pad_type: Optional[str]="pkcs1", *
     if not (0 <= m < n):
         raise RSAEncryptionException("m too big. Assertion 0 <= m < n should hold at all times")
 
-    c =  int_pow(m, e, n)
+    c = mod_pow(m, e, n, kwargs.get("mod_context"))
     
     if isinstance(m_, bytes):
         return int_to_bytes(c)
@@ -1,6 +1,7 @@
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Sequence
 
 from pws.asymmetric.rsa.helpers import AbstractText
+from pws.math import CRTContext, prod
 from pws.asymmetric.rsa.encrypt import encrypt as rsa_encrypt
 from pws.asymmetric.rsa.decrypt import decrypt as rsa_decrypt
 from pws.asymmetric.rsa.sign import sign as rsa_sign
@@ -13,12 +14,11 @@ class RSAPublicKey:
         self.e = e
         self.n = n
 
-
-    def encrypt(self, m: AbstractText, pad_type: Optional[str]="pkcs1") -> AbstractText:
-        return rsa_encrypt(m, self.e, self.n, pad_type)
+    def encrypt(self, m: AbstractText, pad_type: Optional[str]="pkcs1", **kwargs) -> AbstractText:
+        return rsa_encrypt(m, self.e, self.n, pad_type, **kwargs)
     
-    def verify(self, m: AbstractText, sigma: AbstractText, pad_type: Optional[str]="pss") -> bool:
-        return rsa_verify(m, sigma, e=self.e, n=self.n, pad_type=pad_type)
+    def verify(self, m: AbstractText, sigma: AbstractText, pad_type: Optional[str]="pss", **kwargs) -> bool:
+        return rsa_verify(m, sigma, e=self.e, n=self.n, pad_type=pad_type, **kwargs)
 
     def __repr__(self):
         return f"RSAPublicKey(e={hex(self.e)}, n={hex(self.n)})"
@@ -26,17 +26,42 @@ class RSAPublicKey:
 
 class RSAPrivateKey:
 
-    def __init__(self, d, n):
+    def __init__(self, d, n, primes: Optional[Sequence[int]]=None):
+        """
+        `primes` are the (distinct) prime factors of `n`, if known: two for ordinary RSA,
+        more for multi-prime RSA. With them, private key operations use the CRT, with
+        the cached `crt_context`, which makes them about 3 times faster for two primes.
+        """
+
         self.d = d
         self.n = n
 
-    def decrypt(self, c: AbstractText, pad_type: Optional[str]="pkcs1") -> AbstractText:
+        if primes is not None and prod(*primes) != n:
+            raise ValueError("The product of `primes` does not equal the modulus.")
+
+        self.primes = tuple(primes) if primes is not None else None
+
+        self._crt_context: Optional[CRTContext] = None
+
+    @property
+    def crt_context(self) -> Optional[CRTContext]:
+        """Precomputed CRT context for the prime factors of n, or None if they are not known."""
+
+        if self.primes is None:
+            return None
+
+        if self._crt_context is None:
+            self._crt_context = CRTContext(self.primes)
+
+        return self._crt_context
+
+    def decrypt(self, c: AbstractText, pad_type: Optional[str]="pkcs1", **kwargs) -> AbstractText:
 
-        return rsa_decrypt(c, self.d, self.n, pad_type)
+        return rsa_decrypt(c, self.d, self.n, pad_type, crt_context=self.crt_context, **kwargs)
     
-    def sign(self, m: AbstractText, pad_type: Optional[str]="pss") -> AbstractText:
+    def sign(self, m: AbstractText, pad_type: Optional[str]="pss", **kwargs) -> AbstractText:
         
-        return rsa_sign(m, d=self.d, n=self.n, pad_type=pad_type)
+        return rsa_sign(m, d=self.d, n=self.n, pad_type=pad_type, crt_context=self.crt_context, **kwargs)
 
 
     def __repr__(self):
@@ -1,10 +1,11 @@
-from typing import Callable
+from typing import Callable, Union, Type, Optional
 import struct
 import secrets
 
 from math import ceil
 
-from pws.hash import SHA1 as sha1
+from pws.hash import SHA1 as sha1, SHAKE128, SHAKE256
+from pws.hash.abstracthash import Hash
 
 from pws.helpers import xor_bytes as _xor
 
@@ -68,7 +69,16 @@ def unpad_pkcs1_v1_5(m_: AbstractText) -> AbstractText:
     else:
         return unpadded
 
-HashFunc = Callable[[bytes], bytes]
+# Either a function returning the digest of its argument, or a `Hash` subclass such as SHA1 or SHA512.
+HashFunc = Union[Callable[[bytes], bytes], Type[Hash]]
+
+def as_digest_func(hash_func: HashFunc) -> Callable[[bytes], bytes]:
+    """Turn `hash_func` into a function returning the digest of its argument."""
+
+    if isinstance(hash_func, type) and issubclass(hash_func, Hash):
+        return lambda x: hash_func(x).digest
+
+    return hash_func
 
 # OAEP implementations
 
@@ -77,34 +87,85 @@ def _mgf(message: bytes, size: int, hash_func: HashFunc):
     Mask generation function, used for OAEP and PSS padding.
     The mask generation function is similar to a cryptograhpic 
     hash function, except that it supports output of arbitrary lengths.
+
+    This is MGF1, as specified here:
+    https://tools.ietf.org/html/rfc8017#appendix-B.2.1
+
+    If `hash_func` is a `Hash` subclass, `message` is absorbed only once: for every
+    counter value, a copy of that midstate is finished, instead of hashing `message` all over again.
     """
     
-    cnt  = 0
-    result = b""
-    while len(result) < size:
-        c = message + struct.pack(">I", cnt)
-        result += hash_func(c)
+    if isinstance(hash_func, type) and issubclass(hash_func, Hash):
+        midstate = hash_func(message)
+
+        def counter_digest(counter: bytes) -> bytes:
+            h = midstate.copy()
+            h.update(counter)
+            return h.digest
+    else:
+        counter_digest = lambda counter: hash_func(message + counter)
+
+    result = bytearray(size)
+    
+    cnt = 0
+    offset = 0
+    while offset < size:
+        digest = counter_digest(struct.pack(">I", cnt))
+        
+        # the last digest may only be needed in part.
+        result[offset:offset + len(digest)] = digest[:size - offset]
+        offset += len(digest)
         cnt += 1
 
-    return result[:size]
+    return bytes(result)
 
-_sha1digest = lambda x: sha1(x).digest
+# A mask generation function takes a seed and the mask length, and returns the mask.
+MGF = Callable[[bytes, int], bytes]
+
+def mgf_shake128(seed: bytes, size: int) -> bytes:
+    """
+    Mask generation function based on the SHAKE128 extendable-output function.
+    The seed is absorbed once, and the full mask is squeezed out in a single pass.
+    """
+
+    return SHAKE128(seed).squeeze(size)
+
+def mgf_shake256(seed: bytes, size: int) -> bytes:
+    """
+    Mask generation function based on the SHAKE256 extendable-output function.
+    The seed is absorbed once, and the full mask is squeezed out in a single pass.
+    """
+
+    return SHAKE256(seed).squeeze(size)
+
+def _get_mgf(mgf: Optional[MGF], hash_func: HashFunc) -> MGF:
+    """Returns `mgf`, or MGF1 using `hash_func` if no mask generation function is supplied."""
+
+    if mgf is not None:
+        return mgf
+
+    return lambda seed, size: _mgf(seed, size, hash_func=hash_func)
 
 def pad_oaep(
         m_: AbstractText,
         n_size: int,
         label: bytes=b"",
-        hash_func: HashFunc=_sha1digest
+        hash_func: HashFunc=sha1,
+        mgf: Optional[MGF]=None
         ) -> AbstractText:
     """
     Pad a message using the OAEP padding scheme
     
-    `label` and `hash_func` should be agreed upon between public and private key holder(s).
+    `label`, `hash_func` and `mgf` should be agreed upon between public and private key holder(s).
+    If no mask generation function `mgf` is supplied, MGF1 using `hash_func` is used.
 
     The OAEP padding encoding specification can be found here:
     https://tools.ietf.org/html/rfc8017#section-7.1.1
     """
 
+    mgf = _get_mgf(mgf, hash_func)
+    hash_func = as_digest_func(hash_func)
+
     if isinstance(m_, int):
         m = int_to_bytes(m_)
     else:
@@ -132,13 +193,13 @@ def pad_oaep(
     seed = secrets.token_bytes(hash_len)
     
     # create a random mask using our mask generation and said seed.
-    db_mask = _mgf(seed, n_size - hash_len - 1, hash_func=hash_func)
+    db_mask = mgf(seed, n_size - hash_len - 1)
     
     # xor the data block with the mask
     masked_db = _xor(db, db_mask)
     
     # create a mask for the seed using our masked data block
-    seed_mask = _mgf(masked_db, hash_len, hash_func=hash_func)
+    seed_mask = mgf(masked_db, hash_len)
     masked_seed = _xor(seed, seed_mask)
     
     # make a final encoded message using a null byte, our masked seed, and our masked db.
@@ -154,17 +215,22 @@ def unpad_oaep(
         m_: AbstractText,
         n_size: int,
         label: bytes=b"",
-        hash_func: HashFunc=_sha1digest
+        hash_func: HashFunc=sha1,
+        mgf: Optional[MGF]=None
         ) -> AbstractText:
     """
     Unpad a message encoded with the OAEP padding scheme
     
-    `label` and `hash_func` should be agreed upon between public and private key holder(s).
+    `label`, `hash_func` and `mgf` should be agreed upon between public and private key holder(s).
+    If no mask generation function `mgf` is supplied, MGF1 using `hash_func` is used.
 
     The OAEP padding decoding specficiation can be found here:
     https://tools.ietf.org/html/rfc8017#section-7.1.2
     """
 
+    mgf = _get_mgf(mgf, hash_func)
+    hash_func = as_digest_func(hash_func)
+
     if isinstance(m_, int):
         # we need to account for the automatically stripped 00 byte
         # gotcha: Simply appending a "00" will fail in certain edge cases where the leftmost byte of masked_seed is 00 as well. (approx. 1/256)
@@ -187,11 +253,11 @@ def unpad_oaep(
         raise RSAOAEPPaddingException("Failed first byte check: Y byte nonzero")
     
     # recover our seed by generating a seed mask from masked_db
-    seed_mask = _mgf(masked_db, hash_len, hash_func=hash_func)
+    seed_mask = mgf(masked_db, hash_len)
     seed = _xor(masked_seed, seed_mask)
     
     # then recover our data block by generating a data block mask from seed
-    db_mask = _mgf(seed, n_size - hash_len - 1, hash_func=hash_func)
+    db_mask = mgf(seed, n_size - hash_len - 1)
     db = _xor(masked_db, db_mask)
     
     # split the stored label hash and the rest of the message
@@ -230,14 +296,16 @@ def pad_pss(
         m_: AbstractText,
         n_size_bits: int,
         salt_len: int = 20,
-        hash_func: HashFunc=_sha1digest
+        hash_func: HashFunc=sha1,
+        mgf: Optional[MGF]=None
         ) -> AbstractText:
     """
     Hash, then pad a message using the PSS signature scheme.
     Notice how this differs from encryption padding schemes, where
     the whole message `m` is padded, instead of its hash.
     
-    `salt_len` and `hash_func` should be agreed upon between public and private key holder(s).
+    `salt_len`, `hash_func` and `mgf` should be agreed upon between public and private key holder(s).
+    If no mask generation function `mgf` is supplied, MGF1 using `hash_func` is used.
     `n_size_bits` should be ONE LESS than the minimum amount of bits needed to represent `n`,
     so that 0 <= m < n can be guaranteed at all times (if barely).
 
@@ -245,6 +313,9 @@ def pad_pss(
     https://tools.ietf.org/html/rfc8017#section-9.1.1
 
     """
+
+    mgf = _get_mgf(mgf, hash_func)
+    hash_func = as_digest_func(hash_func)
    
     # salt length should be non-negative.
     assert salt_len >= 0
@@ -287,7 +358,7 @@ def pad_pss(
     assert len(db) == n_size - hash_len - 1
     
     # generate a mask for the data block, using H ( = m_prime_hash), and mask the data block with it.
-    db_mask = _mgf(m_prime_hash, n_size - hash_len - 1, hash_func=hash_func)
+    db_mask = mgf(m_prime_hash, n_size - hash_len - 1)
     masked_db = bytearray(_xor(db, db_mask))
     
     # to make sure 0 <= m < n, we need to zero the leftmost n_size * 8 - n_size_bits bits
@@ -316,7 +387,8 @@ def unpad_verify_pss(
         em_: AbstractText, # signature
         n_size_bits: int,
         salt_len: int = 20,
-        hash_func: HashFunc=_sha1digest
+        hash_func: HashFunc=sha1,
+        mgf: Optional[MGF]=None
         ) -> bool:
     """
     Unpad and verify a message (hash) encoded with the PSS padding scheme.
@@ -325,7 +397,8 @@ def unpad_verify_pss(
     A message digest `m_hash` of the message to be verified
     should be provided, which is compared to the unpadded message.
     
-    `salt_len` and `hash_func` should be agreed upon between public and private key holder(s).
+    `salt_len`, `hash_func` and `mgf` should be agreed upon between public and private key holder(s).
+    If no mask generation function `mgf` is supplied, MGF1 using `hash_func` is used.
     `n_size_bits` should be ONE LESS than the minimum amount of bits needed to represent `n`,
     so that 0 <= m < n can be guaranteed at all times (if barely).
     
@@ -333,6 +406,9 @@ def unpad_verify_pss(
     https://tools.ietf.org/html/rfc8017#section-9.1.2
     """
 
+    mgf = _get_mgf(mgf, hash_func)
+    hash_func = as_digest_func(hash_func)
+
     # salt length should be non-negative
     assert salt_len > 0
     
@@ -372,7 +448,7 @@ def unpad_verify_pss(
     masked_db = bytes(masked_db)
     
     # generate the data block mask, and recover the original data block.
-    db_mask = _mgf(h, len(em) - hash_len - 1, hash_func=hash_func)
+    db_mask = mgf(h, len(em) - hash_len - 1)
     db = bytearray(_xor(masked_db, db_mask))
     
     # be sure to clear the leftmost to_be_zero bits again, similar to the encoding routine.
@@ -391,8 +467,8 @@ def unpad_verify_pss(
         raise RSAPSSPaddingException(f"Delimiter byte does not match: expected 0x01, got {hex(db[n_padding + 1])}")
     
     # fetch the salt from the data block.
-    salt = db[-hash_len:]
-    if len(salt) != hash_len:
+    salt = db[len(db) - salt_len:]
+    if len(salt) != salt_len:
         raise RSAPSSPaddingException(f"Failed decomposition into components of DB")
     
     # Construct the hash again by appending 8 null bytes, the message hash, and the salt.
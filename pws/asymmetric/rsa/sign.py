@@ -5,16 +5,18 @@ from pws.asymmetric.rsa.pad import pad_pss
 
 from pws.asymmetric.rsa.error import RSASignException
 
-from pws.math import int_pow
+from pws.hash import SHA1
 
-def sign(m_: AbstractText, d: int, n: int, pad_type: Optional[str]="pss", **kwrags) -> AbstractText:
+from pws.asymmetric.rsa.helpers import mod_pow, crt_pow
+
+def sign(m_: AbstractText, d: int, n: int, pad_type: Optional[str]="pss", **kwargs) -> AbstractText:
     
     if pad_type and not pad_type in ["pss", "none"]:
         raise RSASignException("Invalid padding mode \"{pad_type}\" selected. Valid choices are \"pss\", \"none\"")
 
     
     pad_function = {
-            "pss": lambda x: pad_pss(x, n_size_bits=(bit_length(n) - 1)),
+            "pss": lambda x: pad_pss(x, n_size_bits=(bit_length(n) - 1), hash_func=kwargs.get("hash_func", SHA1), mgf=kwargs.get("mgf")),
             "none": lambda x: x,
             None: lambda x: x
             }[pad_type]
@@ -27,7 +29,10 @@ def sign(m_: AbstractText, d: int, n: int, pad_type: Optional[str]="pss", **kwra
     if not (0 <= m <= n):
         raise RSASignException("m too big. Assertion 0 <= m < n should hold at all times")
 
-    sigma = int_pow(m, d, n)
+    if kwargs.get("crt_context") is not None:
+        sigma = crt_pow(m, d, kwargs["crt_context"])
+    else:
+        sigma = mod_pow(m, d, n, kwargs.get("mod_context"))
 
     if isinstance(m_, bytes):
         return int_to_bytes(sigma)
@@ -2,12 +2,12 @@ from typing import Optional
 
 from pws.asymmetric.rsa.helpers import AbstractText, int_to_bytes, bytes_to_int, byte_length, bit_length
 
-from pws.asymmetric.rsa.pad import unpad_verify_pss
+from pws.asymmetric.rsa.pad import unpad_verify_pss, as_digest_func
 from pws.hash import SHA1
 
 from pws.asymmetric.rsa.error import RSAVerifyException
 
-from pws.math import int_pow
+from pws.asymmetric.rsa.helpers import mod_pow
 
 def verify(m: AbstractText, sigma: AbstractText, e: int, n: int, pad_type: Optional[str]="pss", **kwargs) -> bool:
 
@@ -15,7 +15,7 @@ def verify(m: AbstractText, sigma: AbstractText, e: int, n: int, pad_type: Optio
         raise RSAVerifyException("Invalid padding mode \"{pad_type}\" selected. Valid choices are \"pss\", \"none\"")
     
 
-    hash_func = kwargs.get("hash_func", lambda x: SHA1(x).digest)
+    hash_func = kwargs.get("hash_func", SHA1)
     
     # We want our signature to be exponentiable
     if isinstance(sigma, bytes):
@@ -25,17 +25,17 @@ def verify(m: AbstractText, sigma: AbstractText, e: int, n: int, pad_type: Optio
     if isinstance(m, int):
         m = int_to_bytes(m)
     
-    decrypted = int_pow(sigma, e, n)
+    decrypted = mod_pow(sigma, e, n, kwargs.get("mod_context"))
 
     
     # takes a digest and a "decrypted" signature
     unpad_verify_function = {
-        "pss": lambda m_, a: unpad_verify_pss(m_, a, n_size_bits=(bit_length(n) - 1), hash_func=hash_func),
+        "pss": lambda m_, a: unpad_verify_pss(m_, a, n_size_bits=(bit_length(n) - 1), hash_func=hash_func, mgf=kwargs.get("mgf")),
         "none": lambda m_, a: m_ == a,
         None: lambda m_, a: m_ == a
     }[pad_type]
 
-    return unpad_verify_function(hash_func(m), decrypted)
+    return unpad_verify_function(as_digest_func(hash_func)(m), decrypted)
 
 
 
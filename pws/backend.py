@@ -0,0 +1,162 @@
+from typing import Any, Callable, Dict, List, Optional, Set
+import warnings
+import os
+
+
+# Name of the pure-Python implementation every primitive starts out with.
+REFERENCE = "reference"
+
+# Environment variables selecting backends:
+# PWS_BACKEND_<PRIMITIVE> (e.g. PWS_BACKEND_SHA256=hashlib) selects the backend of a single primitive,
+# PWS_BACKEND (e.g. PWS_BACKEND=hashlib,builtin) lists preferred backends for every primitive.
+ENV_PREFIX = "PWS_BACKEND"
+
+
+class BackendError(Exception):
+    pass
+
+
+class BackendSelfTestError(BackendError):
+    pass
+
+
+# primitive -> backend name -> implementation
+_backends: Dict[str, Dict[str, Any]] = {}
+
+# primitive -> name of the active backend
+_active: Dict[str, str] = {}
+
+# primitive -> function checking a candidate implementation against the reference
+_selftests: Dict[str, Callable[[Any], bool]] = {}
+
+# primitive -> names of the backends that passed the self-test (or need none)
+_tested: Dict[str, Set[str]] = {}
+
+
+def _env_preference(primitive: str) -> List[str]:
+    """Backend names requested for `primitive` through the environment, most preferred first."""
+
+    var = ENV_PREFIX + "_" + "".join(c if c.isalnum() else "_" for c in primitive.upper())
+
+    names = []
+    for value in (os.environ.get(var, ""), os.environ.get(ENV_PREFIX, "")):
+        names += [name.strip() for name in value.split(",") if name.strip()]
+
+    return names
+
+
+def _select_from_env(primitive: str) -> None:
+    """Activate the most preferred backend requested through the environment, if any is registered and passes the self-test."""
+
+    for name in _env_preference(primitive):
+        if name in _backends[primitive]:
+            try:
+                _selftest(primitive, name)
+            except BackendSelfTestError as e:
+                warnings.warn(str(e))
+                continue
+
+            _active[primitive] = name
+            return
+
+
+def _selftest(primitive: str, name: str) -> None:
+    """Run the self-test of backend `name`, if it has not passed it yet. A failing backend is unregistered."""
+
+    if name in _tested[primitive]:
+        return
+
+    check = _selftests.get(primitive)
+
+    if check is not None and not check(_backends[primitive][name]):
+        del _backends[primitive][name]
+        raise BackendSelfTestError(f"Backend '{name}' for '{primitive}' does not agree with the reference implementation.")
+
+    _tested[primitive].add(name)
+
+
+def register(primitive: str, name: str, impl: Any, selftest: Optional[Callable[[Any], bool]]=None) -> None:
+    """
+    Register implementation `impl` of `primitive` under `name`.
+
+    The first implementation of a primitive has to be its reference implementation (named `REFERENCE`),
+    which is active by default. It may come with a `selftest`, which is given every other implementation,
+    and should return whether it agrees with the reference implementation. The self-test is run the first time
+    an implementation is selected (with `use`, or through the environment), so that registering stays cheap
+    at import time. Implementations failing it are unregistered, and rejected with a BackendSelfTestError.
+
+    All implementations of a primitive share the same interface, which is up to the primitive.
+    """
+
+    if primitive not in _backends:
+        if name != REFERENCE:
+            raise BackendError(f"The first backend registered for '{primitive}' should be its reference implementation.")
+
+        _backends[primitive] = {REFERENCE: impl}
+        _active[primitive] = REFERENCE
+        _tested[primitive] = {REFERENCE}
+
+        if selftest is not None:
+            _selftests[primitive] = selftest
+
+        return
+
+    if name in _backends[primitive]:
+        raise BackendError(f"Backend '{name}' is already registered for '{primitive}'.")
+
+    _backends[primitive][name] = impl
+
+    _select_from_env(primitive)
+
+
+def _check_primitive(primitive: str) -> None:
+    if primitive not in _backends:
+        raise BackendError(f"Unknown primitive '{primitive}'. Choose from: {list(_backends.keys())}")
+
+
+def use(primitive: str, name: str) -> None:
+    """
+    Make backend `name` the active implementation of `primitive`.
+    Raises a BackendSelfTestError if it does not pass the self-test of the primitive.
+    """
+
+    _check_primitive(primitive)
+
+    if name not in _backends[primitive]:
+        raise BackendError(f"Unknown backend '{name}' for '{primitive}'. Choose from: {available(primitive)}")
+
+    _selftest(primitive, name)
+
+    _active[primitive] = name
+
+
+def get(primitive: str) -> Any:
+    """Return the active implementation of `primitive`."""
+
+    return _backends[primitive][_active[primitive]]
+
+
+def active(primitive: str) -> str:
+    """Return the name of the active backend of `primitive`."""
+
+    _check_primitive(primitive)
+
+    return _active[primitive]
+
+
+def is_reference(primitive: str) -> bool:
+    return _active[primitive] == REFERENCE
+
+
+def available(primitive: str) -> List[str]:
+    """Return the names of all backends registered for `primitive`, the reference implementation first."""
+
+    _check_primitive(primitive)
+
+    return list(_backends[primitive].keys())
+
+
+def backends() -> Dict[str, str]:
+    """Return the name of the active backend of every registered primitive."""
+
+    return dict(_active)
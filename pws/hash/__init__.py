@@ -1,2 +1,10 @@
 from pws.hash.md5 import MD5
 from pws.hash.sha1 import SHA1
+from pws.hash.sha256 import SHA256
+from pws.hash.sha512 import SHA512, SHA384, SHA512_256
+from pws.hash.blake2 import BLAKE2b, BLAKE2s
+from pws.hash.sha3 import SHA3_224, SHA3_256, SHA3_384, SHA3_512, SHAKE128, SHAKE256
+from pws.hash.sha256_many import sha256_many
+from pws.hash.treehash import tree_hash
+from pws.hash.merklelog import MerkleLog, MemoryNodeStore, FileNodeStore, verify_inclusion, verify_consistency
+from pws.hash.files import hash_file, hash_files
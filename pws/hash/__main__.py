@@ -0,0 +1,121 @@
+import argparse
+import contextlib
+import sys
+
+from pws.hash.files import ALGORITHMS, DEFAULT_CHUNK_SIZE, iter_hash_files, format_line, parse_line, escape_path
+
+
+PROG = "pws.hash"
+
+
+def _plural(n: int, singular: str, plural: str) -> str:
+    return f"{n} {singular if n == 1 else plural}"
+
+
+def check(checklists, algo: str, workers, chunk_size: int, quiet: bool=False, status: bool=False) -> int:
+    """
+    Verify the checksums listed in the files `checklists`, as written by `sha256sum`, `md5sum` and friends.
+    Returns the exit status: 0 if all checksums matched, 1 otherwise.
+    """
+
+    digest_length = 2 * len(ALGORITHMS[algo]().digest)
+
+    exit_code = 0
+
+    for checklist in checklists:
+        try:
+            # Don't close standard input: a later "-" may read it again.
+            with (contextlib.nullcontext(sys.stdin) if checklist == "-" else open(checklist, "r")) as f:
+                lines = f.readlines()
+        except OSError as e:
+            print(f"{PROG}: {checklist}: {e.strerror}", file=sys.stderr)
+            exit_code = 1
+            continue
+
+        entries = []
+        n_improper = 0
+
+        for line in lines:
+            entry = parse_line(line)
+
+            if entry is None or len(entry[1]) != digest_length:
+                n_improper += 1
+            else:
+                entries.append(entry)
+
+        if not entries:
+            print(f"{PROG}: {checklist}: no properly formatted checksum lines found", file=sys.stderr)
+            exit_code = 1
+            continue
+
+        n_mismatch = n_unreadable = 0
+        expected = [digest for _, digest in entries]
+
+        for (path, digest, error), should_match in zip(iter_hash_files([path for path, _ in entries], algo, workers, chunk_size, recursive=False), expected):
+
+            # Like sha256sum, escape names with line breaks in the report as well.
+            name = "".join(escape_path(path)) if "\n" in path or "\r" in path else path
+
+            if error is not None:
+                n_unreadable += 1
+                if not status:
+                    print(f"{PROG}: {path}: {error}", file=sys.stderr)
+                    print(f"{name}: FAILED open or read")
+
+            elif digest != should_match:
+                n_mismatch += 1
+                if not status:
+                    print(f"{name}: FAILED")
+
+            elif not (quiet or status):
+                print(f"{name}: OK")
+
+        if not status:
+            if n_improper:
+                print(f"{PROG}: WARNING: {_plural(n_improper, 'line is', 'lines are')} improperly formatted", file=sys.stderr)
+            if n_unreadable:
+                print(f"{PROG}: WARNING: {_plural(n_unreadable, 'listed file', 'listed files')} could not be read", file=sys.stderr)
+            if n_mismatch:
+                print(f"{PROG}: WARNING: {_plural(n_mismatch, 'computed checksum', 'computed checksums')} did NOT match", file=sys.stderr)
+
+        if n_mismatch or n_unreadable:
+            exit_code = 1
+
+    return exit_code
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(
+            prog=f"python -m {PROG}",
+            description="Print or check checksums, compatible with sha256sum / md5sum / sha1sum.",
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("files", nargs="*", default=["-"], help="Files (or directories) to hash. With no files, or when a file is -, read standard input.")
+    parser.add_argument("--algo", "-a", choices=list(ALGORITHMS.keys()), default="sha256", type=str, help="Hashing algorithm to use.")
+    parser.add_argument("--check", "-c", action="store_true", help="Read checksums from the files and check them.")
+    parser.add_argument("--binary", "-b", action="store_true", help="Mark files as binary in the output (`*` instead of ` `).")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Amount of worker processes. Defaults to the amount of CPUs.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Size (in bytes) of the chunks files are read in.")
+    parser.add_argument("--quiet", action="store_true", help="When checking, don't print OK for each successfully verified file.")
+    parser.add_argument("--status", action="store_true", help="When checking, don't output anything; the exit status shows success.")
+
+    args = parser.parse_args(argv)
+
+    if args.check:
+        return check(args.files, args.algo, args.workers, args.chunk_size, quiet=args.quiet, status=args.status)
+
+    exit_code = 0
+
+    for path, digest, error in iter_hash_files(args.files, args.algo, args.workers, args.chunk_size):
+        if error is not None:
+            print(f"{PROG}: {path}: {error}", file=sys.stderr)
+            exit_code = 1
+        else:
+            print(format_line(path, digest, binary=args.binary))
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,48 @@
-from typing import Optional
+from typing import Optional, Tuple, Type, Dict, Any, List
+import functools
+import hashlib
+import copy
+
+from pws import backend
+
 
 class Hash:
-    """Abstract hash class. Only for inheritance"""
+    """
+    Abstract hash class. Only for inheritance
+
+    Hashes with a `name` are registered as a primitive in `pws.backend`: if an accelerated backend
+    (e.g. hashlib) is selected for it, the hash object transparently delegates to it.
+    Parameters the backend cannot take make the object fall back to the reference implementation.
+    """
+
+    # Name of the hash as a primitive in `pws.backend`, if any.
+    name: Optional[str] = None
+
+    # Constructor parameters to run the backend self-test with, besides the defaults.
+    selftest_params: List[Dict[str, Any]] = []
 
     def __init__(self, first: Optional[bytes]=None):
-        self.delta: bool = False
-        self_digest: Optional[bytes] = None
+        self.delta: bool = True
+        self._digest: Optional[bytes] = None
         
         self._plaintext: Optional[bytes] = None
 
+        # hashlib-style object (with `update`, `digest` and `copy` methods) of the active backend, if not the reference.
+        self._accel = None
+
+        if self.name is not None and backend.active(self.name) != backend.REFERENCE:
+            self._accel = self._new_accel(backend.get(self.name))
+
         if first != None:
             self.update(first)
 
     
     def update(self, data: bytes):
-        self._update(data)
+        if self._accel is not None:
+            self._accel.update(data)
+        else:
+            self._update(data)
+
         self.delta = True
 
     def _update(self, data: bytes):
@@ -23,9 +51,38 @@ class Hash:
         else:
             self._plaintext += data
     
-    def clear():
+    def _backend_params(self) -> Dict[str, Any]:
+        """Keyword arguments for the constructor of an accelerated backend, matching the parameters of this object."""
+
+        return {}
+
+    def _new_accel(self, impl) -> Optional[Any]:
+        """Construct a hashlib-style object with constructor `impl`, or None if it cannot take the parameters of this object."""
+
+        try:
+            return impl(**self._backend_params())
+        except (TypeError, ValueError):
+            return None
+
+    def _accel_digest(self) -> bytes:
+        return self._accel.digest()
+
+    def clear(self):
         self._digest = None
         self.delta = True
+
+    def copy(self) -> 'Hash':
+        """
+        Return a copy of this hash object, including its internal state (the "midstate").
+        Updating the copy does not affect the original, so a common prefix only needs to be hashed once.
+        """
+
+        other = copy.copy(self)
+
+        if self._accel is not None:
+            other._accel = self._accel.copy()
+
+        return other
     
     def compute_digest(self):
         raise NotImplementedError("Abstract class provides no compute_digest functionality")
@@ -33,7 +90,7 @@ class Hash:
     @property
     def digest(self) -> Optional[bytes]:
         if self.delta:
-            self._digest = self.compute_digest()
+            self._digest = self._accel_digest() if self._accel is not None else self.compute_digest()
             self.delta = False
         
         return self._digest
@@ -43,3 +100,129 @@ class Hash:
         digest = self.digest
 
         return digest.hex()
+
+
+class MerkleDamgardHash(Hash):
+    """
+    Abstract class for hashes using the Merkle–Damgård construction. Only for inheritance
+    
+    Data is compressed into the running state as soon as a full block is available,
+    so only the state and a partial block are kept, regardless of the length of the message.
+    
+    Subclasses provide the `initial_state`, the block compression function `_compress`,
+    and the encoding of the final state in `_encode_state`.
+    """
+
+    block_size: int = 64
+    
+    # size (in bytes) and byte order of the message length appended by the padding routine.
+    length_size: int = 8
+    byteorder: str = "big"
+
+    initial_state: Tuple[int, ...] = ()
+
+    def __init__(self, first: Optional[bytes]=None):
+        self._state: Tuple[int, ...] = self.initial_state
+        self._buffer: bytes = b""
+        self._length: int = 0
+
+        super(MerkleDamgardHash, self).__init__(first)
+    
+    @staticmethod
+    def _compress(state: Tuple[int, ...], data: bytes, offset: int) -> Tuple[int, ...]:
+        raise NotImplementedError("Abstract class provides no _compress functionality")
+
+    def _encode_state(self, state: Tuple[int, ...]) -> bytes:
+        raise NotImplementedError("Abstract class provides no _encode_state functionality")
+
+    def _update(self, data: bytes):
+        self._length += len(data)
+
+        if self._buffer:
+            data = self._buffer + data
+        
+        # Compress all full blocks, and keep the remainder for later.
+        block_size = self.block_size
+        n_full = len(data) - (len(data) % block_size)
+
+        compress = self._compress
+        state = self._state
+
+        for n in range(0, n_full, block_size):
+            state = compress(state, data, n)
+
+        self._state = state
+        self._buffer = bytes(data[n_full:])
+
+    def padding(self, length: int) -> bytes:
+        """
+        Padding for a message of `length` bytes:
+        a `1` bit, followed by `0` bits, followed by the length of the message in bits,
+        such that the padded message is a multiple of the block size.
+        """
+
+        n_zero = (self.block_size - self.length_size - 1 - length) % self.block_size
+        bit_length = (8 * length) & ((1 << (8 * self.length_size)) - 1)
+
+        return b"\x80" + b"\x00" * n_zero + bit_length.to_bytes(self.length_size, self.byteorder)
+    
+    def compute_digest(self) -> bytes:
+        
+        # Finish on a copy of the state, so that more data can be added later on.
+        tail = self._buffer + self.padding(self._length)
+        state = self._state
+
+        for n in range(0, len(tail), self.block_size):
+            state = self._compress(state, tail, n)
+
+        return self._encode_state(state)
+
+
+def _reference_digest(cls: Type[Hash], params: Dict[str, Any], data: bytes) -> bytes:
+    h = cls(**params)
+    h._accel = None
+
+    h.update(data)
+
+    return h.digest
+
+
+def _hash_selftest(cls: Type[Hash], impl) -> bool:
+    """Check hashlib-style constructor `impl` against the pure-Python hash `cls`, on messages around the block boundaries."""
+
+    block_size = getattr(cls, "block_size", None) or getattr(cls, "rate", 64)
+
+    for params in [{}] + cls.selftest_params:
+        for length in (0, 1, 3, block_size - 9, block_size - 8, block_size - 1, block_size, block_size + 1, 2 * block_size + 17, 1000):
+            data = bytes((7 * i + length) & 0xff for i in range(length))
+            split = length // 3
+
+            h = cls(**params)
+            h._accel = h._new_accel(impl)
+
+            if h._accel is None:
+                return False
+
+            h.update(data[:split])
+            prefix = h.copy()
+            h.update(data[split:])
+
+            if h.digest != _reference_digest(cls, params, data) or prefix.digest != _reference_digest(cls, params, data[:split]):
+                return False
+
+    return True
+
+
+def register_hash_backends(cls: Type[Hash]) -> None:
+    """
+    Register the pure-Python hash `cls` as the reference implementation of primitive `cls.name`,
+    and hashlib as an accelerated backend, if it provides the algorithm.
+    The backend is only checked against `cls` once it is selected (see `pws.backend`).
+    """
+
+    name = cls.name
+
+    backend.register(name, backend.REFERENCE, cls, selftest=functools.partial(_hash_selftest, cls))
+
+    if name in hashlib.algorithms_available:
+        backend.register(name, "hashlib", getattr(hashlib, name, None) or functools.partial(hashlib.new, name))
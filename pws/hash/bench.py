@@ -0,0 +1,224 @@
+from typing import Optional, List, Dict, Tuple, Callable, Iterable, Type
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import time
+
+from pws import backend
+from pws.hash.abstracthash import Hash
+from pws.hash.md5 import MD5
+from pws.hash.sha1 import SHA1
+from pws.hash.sha256 import SHA256
+from pws.hash.sha512 import SHA512, SHA384
+from pws.hash.blake2 import BLAKE2b, BLAKE2s
+from pws.hash.sha3 import SHA3_256, SHA3_512
+
+
+# Hashes to benchmark: name -> (pws class, hashlib constructor).
+HASHES: Dict[str, Tuple[Type[Hash], Callable]] = {
+    "md5": (MD5, hashlib.md5),
+    "sha1": (SHA1, hashlib.sha1),
+    "sha256": (SHA256, hashlib.sha256),
+    "sha384": (SHA384, hashlib.sha384),
+    "sha512": (SHA512, hashlib.sha512),
+    "blake2b": (BLAKE2b, hashlib.blake2b),
+    "blake2s": (BLAKE2s, hashlib.blake2s),
+    "sha3_256": (SHA3_256, hashlib.sha3_256),
+    "sha3_512": (SHA3_512, hashlib.sha3_512)
+}
+
+DEFAULT_HASHES = ("md5", "sha1", "sha256")
+
+# Message sizes (in bytes) to benchmark, from per-call overhead up to bulk throughput.
+SIZES = (0, 64, 1 << 10, 1 << 14, 1 << 20, 1 << 26)
+
+# Sizes above this are skipped unless asked for: the pure-Python hashes process about 1 MB/s.
+DEFAULT_MAX_SIZE = 1 << 20
+
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 0.10
+
+
+def _time_per_call(func: Callable[[], object], min_time: float) -> float:
+    """Time `func`, calling it as many times as needed to run for at least `min_time` seconds. Returns seconds per call."""
+
+    number = 1
+
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= min_time:
+            return elapsed / number
+
+        # Aim for the minimum time straight away, rather than doubling many times.
+        number = max(2 * number, int(number * 1.2 * min_time / max(elapsed, 1e-9)))
+
+
+def benchmark(
+        names: Iterable[str]=DEFAULT_HASHES,
+        sizes: Iterable[int]=SIZES,
+        min_time: float=DEFAULT_MIN_TIME
+        ) -> List[dict]:
+    """
+    Benchmark the hashes `names` on messages of every size in `sizes`, against their hashlib counterpart.
+
+    Returns a list with a result per hash and size: the time per call (in ns), the throughput (in MB/s,
+    None for empty messages), the active `pws.backend` backend, and the slowdown ratio against hashlib.
+    """
+
+    results = []
+
+    for name in names:
+        if name not in HASHES:
+            raise ValueError(f"Unsupported hash algorithm '{name}'. Choose from: {list(HASHES.keys())}")
+
+        cls, reference = HASHES[name]
+
+        for size in sizes:
+            data = bytes(size)
+
+            t = _time_per_call(lambda: cls(data).digest, min_time)
+            t_hashlib = _time_per_call(lambda: reference(data).digest(), min_time)
+
+            results.append({
+                "hash": name,
+                "size": size,
+                "backend": backend.active(cls.name) if cls.name is not None else backend.REFERENCE,
+                "ns_per_call": t * 1e9,
+                "mb_per_s": size / t / 1e6 if size else None,
+                "hashlib_ns_per_call": t_hashlib * 1e9,
+                "ratio": t / t_hashlib
+            })
+
+    return results
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float=DEFAULT_THRESHOLD) -> List[dict]:
+    """
+    Compare `results` against the `baseline` results of an earlier run.
+
+    Returns the regressions: the results of hashes and sizes whose slowdown against hashlib (`ratio`) grew
+    by more than a fraction `threshold` of the baseline's, each with the baseline's ratio and time per call,
+    and the relative change. Comparing against hashlib, measured in the same run, rather than absolute times
+    keeps baselines from other machines or Python builds usable. Hashes and sizes missing from the baseline are ignored.
+    """
+
+    base = {(r["hash"], r["size"]): r for r in baseline}
+    regressions = []
+
+    for result in results:
+        old = base.get((result["hash"], result["size"]))
+
+        if old is None:
+            continue
+
+        change = result["ratio"] / old["ratio"] - 1
+
+        if change > threshold:
+            regressions.append(dict(result, baseline_ratio=old["ratio"], baseline_ns_per_call=old["ns_per_call"], change=change))
+
+    return regressions
+
+
+def _parse_size(s: str) -> int:
+    """Parse a size like 1024, 16K, 1M or 64M (binary multiples)."""
+
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    s = s.strip().upper().rstrip("B").rstrip("I")
+
+    if s and s[-1] in units:
+        return int(s[:-1]) * units[s[-1]]
+
+    return int(s)
+
+
+def _format_size(size: int) -> str:
+    for unit, shift in (("MiB", 20), ("KiB", 10)):
+        if size >= 1 << shift and size % (1 << shift) == 0:
+            return f"{size >> shift} {unit}"
+
+    return f"{size} B"
+
+
+def format_results(results: List[dict]) -> str:
+    lines = [f"{'hash':<10} {'size':>10} {'backend':>10} {'ns/call':>14} {'MB/s':>10} {'hashlib MB/s':>13} {'slowdown':>9}"]
+
+    for r in results:
+        mbps = f"{r['mb_per_s']:.3f}" if r["mb_per_s"] is not None else "-"
+        hashlib_mbps = f"{r['size'] / r['hashlib_ns_per_call'] * 1e3:.1f}" if r["size"] else "-"
+
+        lines.append(f"{r['hash']:<10} {_format_size(r['size']):>10} {r['backend']:>10} {r['ns_per_call']:>14.0f} {mbps:>10} {hashlib_mbps:>13} {r['ratio']:>8.1f}x")
+
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+
+    parser = argparse.ArgumentParser(
+            prog="python -m pws.hash.bench",
+            description="Benchmark the pws hashes against hashlib, optionally checking for regressions against a baseline.",
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("hashes", nargs="*", default=list(DEFAULT_HASHES), help=f"Hashes to benchmark. Choose from: {list(HASHES.keys())}")
+    parser.add_argument("--sizes", type=str, default=None, help="Comma-separated message sizes, e.g. 0,64,1K,1M,64M. Defaults to the standard sizes up to --max-size.")
+    parser.add_argument("--max-size", type=str, default="1M", help="Largest of the standard message sizes to benchmark (up to 64M).")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Minimum time (in seconds) to spend on every measurement.")
+    parser.add_argument("--json", type=str, default=None, help="Write the results as JSON to this file (- for standard output).")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON results of an earlier run to check for regressions against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Largest allowed increase in the slowdown against hashlib, as a fraction of the baseline.")
+
+    args = parser.parse_args(argv)
+
+    for name in args.hashes:
+        if name not in HASHES:
+            parser.error(f"unsupported hash '{name}'. Choose from: {list(HASHES.keys())}")
+
+    if args.sizes is not None:
+        sizes = [_parse_size(s) for s in args.sizes.split(",")]
+    else:
+        max_size = _parse_size(args.max_size)
+        sizes = [size for size in SIZES if size <= max_size]
+
+    results = benchmark(args.hashes, sizes, args.min_time)
+
+    print(format_results(results), file=sys.stderr if args.json == "-" else sys.stdout)
+
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "results": results
+        }
+
+        if args.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+
+        regressions = compare(results, baseline, args.threshold)
+
+        for r in regressions:
+            print(f"REGRESSION: {r['hash']} at {_format_size(r['size'])}: {r['ratio']:.1f}x hashlib, "
+                  f"was {r['baseline_ratio']:.1f}x ({r['change']:+.1%}); "
+                  f"{r['ns_per_call']:.0f} ns/call, was {r['baseline_ns_per_call']:.0f} ns/call", file=sys.stderr)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
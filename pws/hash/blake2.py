@@ -0,0 +1,222 @@
+from typing import Optional, Tuple, List, Callable, Dict, Any
+import struct
+
+from pws.hash.abstracthash import Hash, register_hash_backends
+
+
+# Message word permutations, one per round (rounds past the tenth wrap around).
+SIGMA = (
+    ( 0,  1,  2,  3,  4,  5,  6,  7,  8,  9, 10, 11, 12, 13, 14, 15),
+    (14, 10,  4,  8,  9, 15, 13,  6,  1, 12,  0,  2, 11,  7,  5,  3),
+    (11,  8, 12,  0,  5,  2, 15, 13, 10, 14,  3,  6,  7,  1,  9,  4),
+    ( 7,  9,  3,  1, 13, 12, 11, 14,  2,  6,  5, 10,  4,  0, 15,  8),
+    ( 9,  0,  5,  7,  2,  4, 10, 15, 14,  1, 11, 12,  6,  8,  3, 13),
+    ( 2, 12,  6, 10,  0, 11,  8,  3,  4, 13,  7,  5, 15, 14,  1,  9),
+    (12,  5,  1, 15, 14, 13,  4, 10,  0,  7,  6,  3,  9,  2,  8, 11),
+    (13, 11,  7, 14, 12,  1,  3,  9,  5,  0, 15,  4,  8,  6,  2, 10),
+    ( 6, 15, 14,  9, 11,  3,  0,  8, 12,  2, 13,  7,  1,  4, 10,  5),
+    (10,  2,  8,  4,  7,  6,  1,  5, 15, 11,  9, 14,  3, 12, 13,  0),
+)
+
+
+def _generate_compress_source(word_bits: int, rounds: int, rotations: Tuple[int, int, int, int]) -> List[str]:
+    """
+    Generate the source (lines) of a fully unrolled BLAKE2 compression function for words of `word_bits` bits,
+    with `rounds` rounds and G function rotation distances `rotations`.
+
+    The generated function has the signature (h, data, offset, t, last) -> h, compressing the block
+    at `offset` in `data` into state `h`, with byte counter `t`, and `last` set for the final block.
+    """
+
+    M = hex((1 << word_bits) - 1)
+    fmt = "<16Q" if word_bits == 64 else "<16I"
+
+    lines = [
+        "def _compress(h, data, offset, t, last):",
+        "    " + ", ".join(f"m{i}" for i in range(16)) + f" = unpack_from('{fmt}', data, offset)",
+        "    v0, v1, v2, v3, v4, v5, v6, v7 = h",
+        "    v8, v9, v10, v11, v12, v13, v14, v15 = IV",
+        f"    v12 ^= t & {M}",
+        f"    v13 ^= t >> {word_bits}",
+        "    if last:",
+        f"        v14 ^= {M}",
+    ]
+
+    def G(a: int, b: int, c: int, d: int, x: int, y: int) -> None:
+        for m, (r_d, r_b) in ((x, rotations[0:2]), (y, rotations[2:4])):
+            lines.append(f"    v{a} = (v{a} + v{b} + m{m}) & {M}")
+            lines.append(f"    v{d} ^= v{a}")
+            lines.append(f"    v{d} = ((v{d} >> {r_d}) | (v{d} << {word_bits - r_d})) & {M}")
+            lines.append(f"    v{c} = (v{c} + v{d}) & {M}")
+            lines.append(f"    v{b} ^= v{c}")
+            lines.append(f"    v{b} = ((v{b} >> {r_b}) | (v{b} << {word_bits - r_b})) & {M}")
+
+    for i in range(rounds):
+        s = SIGMA[i % 10]
+
+        # Mix the columns..
+        G(0, 4,  8, 12, s[0],  s[1])
+        G(1, 5,  9, 13, s[2],  s[3])
+        G(2, 6, 10, 14, s[4],  s[5])
+        G(3, 7, 11, 15, s[6],  s[7])
+
+        # ..then the diagonals.
+        G(0, 5, 10, 15, s[8],  s[9])
+        G(1, 6, 11, 12, s[10], s[11])
+        G(2, 7,  8, 13, s[12], s[13])
+        G(3, 4,  9, 14, s[14], s[15])
+
+    lines.append("    return (")
+    lines.append(",\n".join(f"        h[{i}] ^ v{i} ^ v{i + 8}" for i in range(8)))
+    lines.append("    )")
+
+    return lines
+
+
+class BLAKE2(Hash):
+    """
+    Abstract BLAKE2 class. Only for inheritance
+
+    BLAKE2 is a fast cryptographic hash function, which needs fewer and simpler rounds per byte
+    than SHA-2, making it much faster in pure software. It supports a keyed mode, which yields
+    a MAC in a single pass (unlike HMAC), and any digest size up to its maximum.
+
+    The BLAKE2 specification can be found here:
+    https://tools.ietf.org/html/rfc7693
+    """
+
+    word_bits: int = 64
+    block_size: int = 128
+    max_digest_size: int = 64
+
+    IV: Tuple[int, ...] = ()
+
+    def __init__(
+            self,
+            first: Optional[bytes]=None,
+            digest_size: Optional[int]=None,
+            key: bytes=b"",
+            salt: bytes=b"",
+            person: bytes=b""
+            ):
+
+        word_bytes = self.word_bits // 8
+
+        digest_size = self.max_digest_size if digest_size is None else digest_size
+
+        if not 1 <= digest_size <= self.max_digest_size:
+            raise ValueError(f"Invalid digest size {digest_size}. Should be in range [1, {self.max_digest_size}].")
+
+        if len(key) > self.max_digest_size:
+            raise ValueError(f"Key too long. Maximum key length is {self.max_digest_size} bytes, got {len(key)}.")
+
+        if len(salt) > 2 * word_bytes or len(person) > 2 * word_bytes:
+            raise ValueError(f"Salt and personalization should be at most {2 * word_bytes} bytes long.")
+
+        self.digest_size = digest_size
+        self._params = {"digest_size": digest_size, "key": key, "salt": salt, "person": person}
+
+        # Parameter block: digest length, key length, fanout = 1, depth = 1, no tree parameters,
+        # followed by the salt and personalization.
+        param = bytes([digest_size, len(key), 1, 1]).ljust(4 * word_bytes, b"\x00")
+        param += salt.ljust(2 * word_bytes, b"\x00") + person.ljust(2 * word_bytes, b"\x00")
+
+        fmt = "<8Q" if self.word_bits == 64 else "<8I"
+
+        self._state: Tuple[int, ...] = tuple(iv ^ p for iv, p in zip(self.IV, struct.unpack(fmt, param)))
+        self._counter: int = 0
+
+        # The key is padded to a full block, and processed as the first block of the message.
+        self._buffer: bytes = key.ljust(self.block_size, b"\x00") if key else b""
+
+        super(BLAKE2, self).__init__(first)
+
+    def _backend_params(self) -> Dict[str, Any]:
+        # hashlib.blake2b and hashlib.blake2s take the same parameters.
+        return self._params
+
+    @staticmethod
+    def _compress(state: Tuple[int, ...], data: bytes, offset: int, t: int, last: bool) -> Tuple[int, ...]:
+        raise NotImplementedError("Abstract class provides no _compress functionality")
+
+    def _update(self, data: bytes):
+        data = self._buffer + data
+
+        # The final block is compressed differently, so always hold back the last (possibly full) block.
+        block_size = self.block_size
+        n_process = ((len(data) - 1) // block_size) * block_size if data else 0
+
+        compress = self._compress
+        state, counter = self._state, self._counter
+
+        for n in range(0, n_process, block_size):
+            counter += block_size
+            state = compress(state, data, n, counter, False)
+
+        self._state, self._counter = state, counter
+        self._buffer = bytes(data[n_process:])
+
+    def compute_digest(self) -> bytes:
+
+        # Finish on a copy of the state, so that more data can be added later on.
+        block = self._buffer.ljust(self.block_size, b"\x00")
+        state = self._compress(self._state, block, 0, self._counter + len(self._buffer), True)
+
+        fmt = "<8Q" if self.word_bits == 64 else "<8I"
+
+        return struct.pack(fmt, *state)[:self.digest_size]
+
+
+class BLAKE2b(BLAKE2):
+    """BLAKE2b: 64-bit words, 12 rounds, digests of up to 64 bytes. Optimized for 64-bit platforms."""
+
+    name = "blake2b"
+
+    word_bits = 64
+    block_size = 128
+    max_digest_size = 64
+
+    selftest_params = [{"digest_size": 20, "key": b"key", "salt": b"salt", "person": b"person"}]
+
+    IV = (
+        0x6a09e667f3bcc908, 0xbb67ae8584caa73b, 0x3c6ef372fe94f82b, 0xa54ff53a5f1d36f1,
+        0x510e527fade682d1, 0x9b05688c2b3e6c1f, 0x1f83d9abfb41bd6b, 0x5be0cd19137e2179
+    )
+
+    @staticmethod
+    def _compress(state: Tuple[int, ...], data: bytes, offset: int, t: int, last: bool) -> Tuple[int, ...]:
+        return _compress_b(state, data, offset, t, last)
+
+
+class BLAKE2s(BLAKE2):
+    """BLAKE2s: 32-bit words, 10 rounds, digests of up to 32 bytes. Optimized for 8- to 32-bit platforms."""
+
+    name = "blake2s"
+
+    word_bits = 32
+    block_size = 64
+    max_digest_size = 32
+
+    selftest_params = [{"digest_size": 20, "key": b"key", "salt": b"salt", "person": b"person"}]
+
+    IV = (
+        0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+        0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+    )
+
+    @staticmethod
+    def _compress(state: Tuple[int, ...], data: bytes, offset: int, t: int, last: bool) -> Tuple[int, ...]:
+        return _compress_s(state, data, offset, t, last)
+
+
+def _build_compress(cls, rounds: int, rotations: Tuple[int, int, int, int]) -> Callable:
+    namespace = {"unpack_from": struct.unpack_from, "IV": cls.IV}
+    exec("\n".join(_generate_compress_source(cls.word_bits, rounds, rotations)), namespace)
+
+    return namespace["_compress"]
+
+_compress_b = _build_compress(BLAKE2b, 12, (32, 24, 16, 63))
+_compress_s = _build_compress(BLAKE2s, 10, (16, 12, 8, 7))
+
+register_hash_backends(BLAKE2b)
+register_hash_backends(BLAKE2s)
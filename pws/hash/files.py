@@ -0,0 +1,230 @@
+from typing import Optional, List, Tuple, Iterable, Iterator, Dict, Type
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+import sys
+
+from pws.hash.abstracthash import Hash
+from pws.hash.md5 import MD5
+from pws.hash.sha1 import SHA1
+from pws.hash.sha256 import SHA256
+from pws.hash.sha512 import SHA512, SHA384
+from pws.hash.blake2 import BLAKE2b
+
+
+ALGORITHMS: Dict[str, Type[Hash]] = {
+    "md5": MD5,
+    "sha1": SHA1,
+    "sha256": SHA256,
+    "sha384": SHA384,
+    "sha512": SHA512,
+    "blake2b": BLAKE2b
+}
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Files at least this large are memory-mapped instead of read in chunks.
+MMAP_THRESHOLD = 1 << 26
+
+
+def _get_algorithm(algo: str) -> Type[Hash]:
+    if algo not in ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm '{algo}'. Choose from: {list(ALGORITHMS.keys())}")
+
+    return ALGORITHMS[algo]
+
+
+def hash_file(path: str, algo: str="sha256", chunk_size: int=DEFAULT_CHUNK_SIZE) -> str:
+    """
+    Compute the hex digest of the file at `path` using hash algorithm `algo`.
+
+    The file is streamed through the incremental hash in chunks of `chunk_size` bytes
+    (or memory-mapped, for large files), so it is never loaded into memory as a whole.
+    The path "-" denotes standard input.
+    """
+
+    h = _get_algorithm(algo)()
+
+    if path == "-":
+        for chunk in iter(lambda: sys.stdin.buffer.read(chunk_size), b""):
+            h.update(chunk)
+
+        return h.hexdigest
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as map_:
+                for n in range(0, size, chunk_size):
+                    h.update(map_[n:n + chunk_size])
+        else:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                h.update(chunk)
+
+    return h.hexdigest
+
+
+def _try_hash_file(path: str, algo: str, chunk_size: int) -> Tuple[Optional[str], Optional[str]]:
+    """Returns a tuple (hexdigest, error): exactly one of them is None."""
+
+    try:
+        return hash_file(path, algo, chunk_size), None
+    except OSError as e:
+        return None, e.strerror or str(e)
+
+
+def expand_paths(paths: Iterable[str], recursive: bool=True) -> Iterator[str]:
+    """
+    Yield `paths`, with every directory replaced by the files it (recursively) contains, in sorted order.
+    If `recursive` is False, `paths` are yielded as is.
+    """
+
+    for path in paths:
+        if recursive and path != "-" and os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def iter_hash_files(
+        paths: Iterable[str],
+        algo: str="sha256",
+        workers: Optional[int]=None,
+        chunk_size: int=DEFAULT_CHUNK_SIZE,
+        recursive: bool=True
+        ) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Hash the files at `paths` concurrently, using a pool of `workers` processes (defaults to the amount of CPUs).
+    Directories are hashed recursively, unless `recursive` is False.
+
+    Yields tuples (path, hexdigest, error) in the order of `paths`. If a file could not be read,
+    its hexdigest is None and `error` holds the reason.
+    """
+
+    _get_algorithm(algo)
+
+    paths = list(expand_paths(paths, recursive))
+    workers = workers or os.cpu_count() or 1
+
+    # Standard input can only be read by this process.
+    if workers == 1 or len(paths) <= 1 or "-" in paths:
+        for path in paths:
+            yield (path, *_try_hash_file(path, algo, chunk_size))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_try_hash_file, paths, [algo] * len(paths), [chunk_size] * len(paths))
+
+        for path, (digest, error) in zip(paths, results):
+            yield path, digest, error
+
+
+def hash_files(
+        paths: Iterable[str],
+        algo: str="sha256",
+        workers: Optional[int]=None,
+        chunk_size: int=DEFAULT_CHUNK_SIZE,
+        recursive: bool=True
+        ) -> List[Tuple[str, str]]:
+    """
+    Hash the files at `paths` concurrently, using a pool of `workers` processes (defaults to the amount of CPUs).
+    Directories are hashed recursively, unless `recursive` is False.
+
+    Returns a list of tuples (path, hexdigest) in the order of `paths`.
+    Raises an OSError if any of the files could not be read.
+    """
+
+    result = []
+
+    for path, digest, error in iter_hash_files(paths, algo, workers, chunk_size, recursive):
+        if error is not None:
+            raise OSError(f"{path}: {error}")
+
+        result.append((path, digest))
+
+    return result
+
+
+def escape_path(path: str) -> Tuple[str, str]:
+    """
+    Escape `path` the way `sha256sum` does for names containing a backslash or newline:
+    backslashes become "\\\\", newlines "\\n" and carriage returns "\\r". Returns a tuple (prefix, escaped path),
+    with prefix "\\" if anything had to be escaped (to be put at the start of the line), "" otherwise.
+    """
+
+    if not any(c in path for c in "\\\n\r"):
+        return "", path
+
+    return "\\", path.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def unescape_path(path: str) -> Optional[str]:
+    """Undo `escape_path` on an escaped `path`. Returns None for invalid escape sequences."""
+
+    result = []
+    i = 0
+
+    while i < len(path):
+        c = path[i]
+
+        if c == "\\":
+            escaped = {"\\": "\\", "n": "\n", "r": "\r"}.get(path[i + 1:i + 2])
+
+            if escaped is None:
+                return None
+
+            result.append(escaped)
+            i += 2
+        else:
+            result.append(c)
+            i += 1
+
+    return "".join(result)
+
+
+def format_line(path: str, digest: str, binary: bool=False) -> str:
+    """Format a checksum line compatible with `sha256sum`, `md5sum` and friends, escaping `path` if needed."""
+
+    prefix, path = escape_path(path)
+
+    return f"{prefix}{digest} {'*' if binary else ' '}{path}"
+
+
+def parse_line(line: str) -> Optional[Tuple[str, str]]:
+    """
+    Parse a checksum line as written by `sha256sum`, `md5sum` and friends into a tuple (path, hexdigest).
+    A line starting with a backslash has an escaped path (see `escape_path`).
+    Returns None for improperly formatted lines.
+    """
+
+    line = line.rstrip("\r\n")
+
+    escaped = line.startswith("\\")
+
+    if escaped:
+        line = line[1:]
+
+    digest, sep, rest = line.partition(" ")
+
+    if not sep or not rest or rest[0] not in " *":
+        return None
+
+    try:
+        bytes.fromhex(digest)
+    except ValueError:
+        return None
+
+    path = rest[1:]
+
+    if escaped:
+        path = unescape_path(path)
+
+        if path is None:
+            return None
+
+    return path, digest.lower()
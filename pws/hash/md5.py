@@ -1,11 +1,11 @@
-from typing import Optional
+from typing import Optional, Tuple
 import struct
 from math import sin, floor
 
-from pws.hash.abstracthash import Hash
+from pws.hash.abstracthash import MerkleDamgardHash, register_hash_backends
 
 
-class MD5(Hash):
+class MD5(MerkleDamgardHash):
     """
     Class for managing and computing MD5 digests.
 
@@ -14,6 +14,8 @@ class MD5(Hash):
     is as a checksum algorithm to verify data integrity.
     """
 
+    name = "md5"
+
     per_round_shifts = [
         7, 12, 17, 22,  7, 12, 17, 22,  7, 12, 17, 22,  7, 12, 17, 22,
         5,  9, 14, 20,  5,  9, 14, 20,  5,  9, 14, 20,  5,  9, 14, 20,
@@ -21,7 +23,41 @@ class MD5(Hash):
         6, 10, 15, 21,  6, 10, 15, 21,  6, 10, 15, 21,  6, 10, 15, 21
     ]
 
-    constants = None
+    # The integer part of the sines of integers (see `generate_constants`), hardcoded
+    # so that no setup is needed on first use.
+    constants = [
+        0xd76aa478, 0xe8c7b756, 0x242070db, 0xc1bdceee,
+        0xf57c0faf, 0x4787c62a, 0xa8304613, 0xfd469501,
+        0x698098d8, 0x8b44f7af, 0xffff5bb1, 0x895cd7be,
+        0x6b901122, 0xfd987193, 0xa679438e, 0x49b40821,
+        0xf61e2562, 0xc040b340, 0x265e5a51, 0xe9b6c7aa,
+        0xd62f105d, 0x02441453, 0xd8a1e681, 0xe7d3fbc8,
+        0x21e1cde6, 0xc33707d6, 0xf4d50d87, 0x455a14ed,
+        0xa9e3e905, 0xfcefa3f8, 0x676f02d9, 0x8d2a4c8a,
+        0xfffa3942, 0x8771f681, 0x6d9d6122, 0xfde5380c,
+        0xa4beea44, 0x4bdecfa9, 0xf6bb4b60, 0xbebfbc70,
+        0x289b7ec6, 0xeaa127fa, 0xd4ef3085, 0x04881d05,
+        0xd9d4d039, 0xe6db99e5, 0x1fa27cf8, 0xc4ac5665,
+        0xf4292244, 0x432aff97, 0xab9423a7, 0xfc93a039,
+        0x655b59c3, 0x8f0ccc92, 0xffeff47d, 0x85845dd1,
+        0x6fa87e4f, 0xfe2ce6e0, 0xa3014314, 0x4e0811a1,
+        0xf7537e82, 0xbd3af235, 0x2ad7d2bb, 0xeb86d391
+    ]
+
+    # Message word index `g` used in every round.
+    per_round_indices = [
+        0, 1,  2,  3,  4,  5,  6,  7,  8,  9, 10, 11, 12, 13, 14, 15,
+        1, 6, 11,  0,  5, 10, 15,  4,  9, 14,  3,  8, 13,  2,  7, 12,
+        5, 8, 11, 14,  1,  4,  7, 10, 13,  0,  3,  6,  9, 12, 15,  2,
+        0, 7, 14,  5, 12,  3, 10,  1,  8, 15,  6, 13,  4, 11,  2,  9
+    ]
+
+    # Per-round (g, s, K) tuples, split up in the four round groups.
+    schedule = tuple(zip(per_round_indices, per_round_shifts, constants))
+    rounds = (schedule[0:16], schedule[16:32], schedule[32:48], schedule[48:64])
+
+    initial_state = (0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476)
+    byteorder = "little"
 
     # Inherit __init__
 
@@ -56,76 +92,22 @@ class MD5(Hash):
 
         return padded
         
-    def compute_digest(self) -> bytes:
-        
-        if not MD5.constants:
-            self.generate_constants()
+    @staticmethod
+    def _compress(state: Tuple[int, ...], data: bytes, offset: int) -> Tuple[int, ...]:
+        return _compress(state, data, offset)
 
-        a_0, b_0, c_0, d_0 = (0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476)
-        padded = self.pad(self._plaintext)
-        
-        # Left rotate x by c bits.            
-        lr = lambda x, c: ((x << c) | (x >> (32-c)))
-        u32 = lambda x: x & 0xffffffff
-
-        # Iterate over 512 bit (= 64 byte) blocks
-        for n in range(0, len(padded), 64):
-            
-            block = padded[n:n+64]
-            
-            def M(idx: int):
-                # Fetch little-endian 32-bit unsigned integer at index `idx` in block.
-                return struct.unpack("<I", block[4*idx:4*(idx+1)])[0]
-            
-            # Initialize hash values for this chunk
-            A, B, C, D = a_0, b_0, c_0, d_0
-
-            for i in range(64):
-            
-                # 48 - 63
-                if i >= 48:
-                    F = C ^ (B | ~D)
-                    g = (7 * i) % 16
-                
-                # 32 - 47
-                elif i >= 32: 
-                    F = B ^ C ^ D
-                    g = (3 * i + 5) % 16
-                
-                # 16 - 31
-                elif i >= 16:
-                    F = (B & D) | (~D & C)
-                    g = (5 * i + 1) % 16
-                
-                # 0 - 15
-                else:
-                    F = (B & C) | (~B & D)
-                    g = i
-                
-                F = u32(F + A + MD5.constants[i] + M(g))
-                A = D
-                D = C
-                C = B
-
-                B += u32(lr(F, MD5.per_round_shifts[i]))
-            
-            # Add chunk's hash to result so far
-            a_0 += A
-            b_0 += B
-            c_0 += C
-            d_0 += D
-        
-        a_0, b_0, c_0, d_0 = (u32(x) for x in (a_0, b_0, c_0, d_0))
-        
+    def _encode_state(self, state: Tuple[int, ...]) -> bytes:
         # Produce the final hash value
-        return struct.pack("<I", a_0) + struct.pack("<I", b_0) + struct.pack("<I", c_0) + struct.pack("<I", d_0)
-    
+        return struct.pack("<4I", *state)
 
     @classmethod
     def generate_constants(cls):
         """
         Generate constants needed for md5 digest computation.
         These constants are the integer part of the sines of integers.
+
+        The resulting table is hardcoded in `MD5.constants`; this routine
+        only serves as a proof of concept.
         """
 
         ## precompute 2**32 so that we don't calculate it every iteration.
@@ -133,3 +115,45 @@ class MD5(Hash):
         
         # fill the constants
         cls.constants = [floor(e * abs( sin(i + 1) )) for i in range(64)]
+
+
+def _compress(h: Tuple[int, int, int, int], data: bytes, offset: int) -> Tuple[int, int, int, int]:
+    """Compress the 64-byte block at `offset` in `data` into the running state `h`."""
+
+    # Fetch all sixteen little-endian 32-bit words of the block at once.
+    M = struct.unpack_from("<16I", data, offset)
+    
+    A, B, C, D = h
+    
+    # 0 - 15
+    for g, s, K in MD5.rounds[0]:
+        F = ((D ^ (B & (C ^ D))) + A + K + M[g]) & 0xffffffff
+        A, D, C = D, C, B
+        B = (B + (((F << s) | (F >> (32 - s))) & 0xffffffff)) & 0xffffffff
+
+    # 16 - 31
+    for g, s, K in MD5.rounds[1]:
+        F = ((C ^ (D & (B ^ C))) + A + K + M[g]) & 0xffffffff
+        A, D, C = D, C, B
+        B = (B + (((F << s) | (F >> (32 - s))) & 0xffffffff)) & 0xffffffff
+
+    # 32 - 47
+    for g, s, K in MD5.rounds[2]:
+        F = ((B ^ C ^ D) + A + K + M[g]) & 0xffffffff
+        A, D, C = D, C, B
+        B = (B + (((F << s) | (F >> (32 - s))) & 0xffffffff)) & 0xffffffff
+    
+    # 48 - 63
+    for g, s, K in MD5.rounds[3]:
+        F = ((C ^ (B | (D ^ 0xffffffff))) + A + K + M[g]) & 0xffffffff
+        A, D, C = D, C, B
+        B = (B + (((F << s) | (F >> (32 - s))) & 0xffffffff)) & 0xffffffff
+    
+    # Add chunk's hash to result so far
+    return (
+        (h[0] + A) & 0xffffffff, (h[1] + B) & 0xffffffff,
+        (h[2] + C) & 0xffffffff, (h[3] + D) & 0xffffffff
+    )
+
+
+register_hash_backends(MD5)
@@ -0,0 +1,62 @@
+from typing import List, Sequence
+
+from pws.hash.sha256 import SHA256
+
+
+# Domain separation prefixes, as used by RFC 6962 (Certificate Transparency).
+# Without these, an interior node could be passed off as a leaf (a second preimage attack).
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+EMPTY_ROOT = SHA256(b"").digest
+
+
+def leaf_hash(data: bytes) -> bytes:
+    """Hash the leaf `data` into a Merkle tree leaf node."""
+
+    return SHA256(LEAF_PREFIX + data).digest
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash the child nodes `left` and `right` into a Merkle tree interior node."""
+
+    return SHA256(NODE_PREFIX + left + right).digest
+
+
+def split_point(n: int) -> int:
+    """
+    Return the largest power of two strictly smaller than `n` (for n > 1).
+
+    A Merkle tree over `n` leaves is split into a left subtree of this size,
+    which is always perfect, and a right subtree containing the rest.
+    """
+
+    assert n > 1
+
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    """
+    Compute the Merkle tree root of the leaf nodes `leaves` (already hashed using `leaf_hash`).
+
+    The tree shape is the one specified by RFC 6962:
+    https://tools.ietf.org/html/rfc6962#section-2.1
+    """
+
+    if len(leaves) == 0:
+        return EMPTY_ROOT
+
+    # Reduce the leaves level by level. Pairing adjacent nodes from the left and
+    # carrying an odd node up unchanged yields exactly the RFC 6962 tree shape.
+    level: List[bytes] = list(leaves)
+
+    while len(level) > 1:
+        paired = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+
+        if len(level) & 1:
+            paired.append(level[-1])
+
+        level = paired
+
+    return level[0]
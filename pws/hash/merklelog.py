@@ -0,0 +1,429 @@
+from typing import Optional, List, Dict, Union
+import os
+
+from pws.hash.merkle import EMPTY_ROOT, leaf_hash, node_hash, split_point
+
+
+DIGEST_SIZE = 32
+
+
+class MemoryNodeStore:
+    """
+    Node store keeping every node of a `MerkleLog` in memory.
+
+    Nodes are addressed by (level, index): the node at level `k` and index `i` is the root of
+    the perfect subtree covering leaves [i * 2^k, (i + 1) * 2^k). Level 0 holds the leaf hashes.
+    """
+
+    def __init__(self):
+        self._levels: List[List[bytes]] = []
+
+    def count(self, level: int) -> int:
+        return len(self._levels[level]) if level < len(self._levels) else 0
+
+    def get(self, level: int, index: int) -> bytes:
+        return self._levels[level][index]
+
+    def append(self, level: int, digest: bytes) -> None:
+        while len(self._levels) <= level:
+            self._levels.append([])
+
+        self._levels[level].append(digest)
+
+    def truncate(self, level: int, count: int) -> None:
+        if level < len(self._levels):
+            del self._levels[level][count:]
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FileNodeStore:
+    """
+    Node store keeping every node of a `MerkleLog` on disk, in the directory `path`.
+
+    Every level is stored in its own file of fixed-size 32-byte records, so a node is
+    found with a single seek. Only a file handle per level is kept in memory.
+    See `MemoryNodeStore` for the node addressing scheme.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self._files = []
+        self._counts: List[int] = []
+        self._dirty = False
+
+        level = 0
+        while os.path.exists(self._level_path(level)):
+            self._open_level(level)
+            level += 1
+
+    def _level_path(self, level: int) -> str:
+        return os.path.join(self.path, f"level-{level:02d}.bin")
+
+    def _open_level(self, level: int) -> None:
+        f = open(self._level_path(level), "a+b")
+
+        # Drop a partially written trailing record, as may be left behind by a crash.
+        size = f.seek(0, os.SEEK_END)
+        if size % DIGEST_SIZE:
+            f.truncate(size - size % DIGEST_SIZE)
+
+        self._files.append(f)
+        self._counts.append(size // DIGEST_SIZE)
+
+    def count(self, level: int) -> int:
+        return self._counts[level] if level < len(self._counts) else 0
+
+    def get(self, level: int, index: int) -> bytes:
+        if not 0 <= index < self.count(level):
+            raise IndexError(f"No node at level {level}, index {index}")
+
+        if self._dirty:
+            self.flush()
+
+        f = self._files[level]
+        f.seek(index * DIGEST_SIZE)
+
+        return f.read(DIGEST_SIZE)
+
+    def append(self, level: int, digest: bytes) -> None:
+        assert len(digest) == DIGEST_SIZE
+
+        while len(self._files) <= level:
+            self._open_level(len(self._files))
+
+        # Files opened in append mode always write at the end, regardless of the current position.
+        self._files[level].write(digest)
+        self._counts[level] += 1
+        self._dirty = True
+
+    def truncate(self, level: int, count: int) -> None:
+        if level < len(self._files) and count < self._counts[level]:
+            self.flush()
+            self._files[level].truncate(count * DIGEST_SIZE)
+            self._counts[level] = count
+
+    def flush(self) -> None:
+        for f in self._files:
+            f.flush()
+
+        self._dirty = False
+
+    def close(self) -> None:
+        self.flush()
+
+        for f in self._files:
+            f.close()
+
+        self._files = []
+        self._counts = []
+
+
+NodeStore = Union[MemoryNodeStore, FileNodeStore]
+
+
+class MerkleLog:
+    """
+    Append-only, tamper-evident log backed by a SHA-256 Merkle tree, as described in RFC 6962 / RFC 9162:
+    https://tools.ietf.org/html/rfc9162#section-2.1
+
+    Appending an entry costs amortized O(1) hashes. The root of the tree is computed incrementally
+    from the frontier: the roots of the perfect subtrees the tree of the current size is composed of
+    (one per set bit in the size). Inclusion and consistency proofs are generated in O(log n) hashes
+    from the nodes in `store`, which may live on disk (see `FileNodeStore`), so only the frontier
+    has to be kept in memory.
+    """
+
+    def __init__(self, store: Optional[NodeStore]=None):
+        self.store = store if store is not None else MemoryNodeStore()
+        self._size = self.store.count(0)
+
+        self._repair()
+
+        # frontier[k] is the root of the perfect subtree of 2^k leaves, if bit `k` of the size is set.
+        self._frontier: Dict[int, bytes] = {}
+
+        for level in range(self._size.bit_length()):
+            if self._size >> level & 1:
+                self._frontier[level] = self.store.get(level, (self._size >> level) - 1)
+
+    def _repair(self) -> None:
+        """
+        Make every level consistent with the leaf level.
+        An interrupted append can leave a level short of nodes, which are then recomputed.
+        """
+
+        level = 0
+        while self.store.count(level):
+            expected = self.store.count(level) // 2
+
+            self.store.truncate(level + 1, expected)
+
+            for i in range(self.store.count(level + 1), expected):
+                self.store.append(level + 1, node_hash(self.store.get(level, 2 * i), self.store.get(level, 2 * i + 1)))
+
+            level += 1
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, data: bytes) -> int:
+        """Append the entry `data` to the log. Returns the index of the entry."""
+
+        return self.append_leaf_hash(leaf_hash(data))
+
+    def append_leaf_hash(self, digest: bytes) -> int:
+        """Append an entry to the log, given its leaf hash `digest`. Returns the index of the entry."""
+
+        index = self._size
+
+        self.store.append(0, digest)
+
+        # Just like incrementing a binary counter: every trailing set bit of the old size
+        # is a perfect subtree which merges with the new one into a subtree twice its size.
+        level = 0
+        while self._size >> level & 1:
+            digest = node_hash(self._frontier.pop(level), digest)
+            level += 1
+
+            self.store.append(level, digest)
+
+        self._frontier[level] = digest
+        self._size += 1
+
+        return index
+
+    def leaf_hash(self, index: int) -> bytes:
+        """Return the leaf hash of the entry at `index`"""
+
+        return self.store.get(0, index)
+
+    def root(self, size: Optional[int]=None) -> bytes:
+        """Return the root hash of the log, or of the log as it was at `size` entries."""
+
+        if size is None or size == self._size:
+            result = None
+
+            # Fold the frontier from the smallest subtree upwards.
+            for level in sorted(self._frontier):
+                result = self._frontier[level] if result is None else node_hash(self._frontier[level], result)
+
+            return result if result is not None else EMPTY_ROOT
+
+        self._check_size(size)
+
+        return self._subtree(0, size) if size else EMPTY_ROOT
+
+    def _check_size(self, size: int) -> None:
+        if not 0 <= size <= self._size:
+            raise ValueError(f"Invalid tree size {size}. Should be in range [0, {self._size}].")
+
+    def _subtree(self, lo: int, hi: int) -> bytes:
+        """
+        Compute the root of the subtree covering leaves [lo, hi).
+
+        Perfect subtrees are always aligned to their size, and are read from the store in one go.
+        Any other subtree is a perfect left subtree and a smaller right subtree, so this takes
+        at most O(log n) hashes.
+        """
+
+        n = hi - lo
+
+        if n & (n - 1) == 0:
+            level = n.bit_length() - 1
+            return self.store.get(level, lo >> level)
+
+        k = split_point(n)
+
+        return node_hash(self.store.get(k.bit_length() - 1, lo // k), self._subtree(lo + k, hi))
+
+    def inclusion_proof(self, index: int, size: Optional[int]=None) -> List[bytes]:
+        """
+        Generate a proof that the entry at `index` is included in the log of `size` entries
+        (defaults to the current size).
+
+        The audit path is generated as specified here:
+        https://tools.ietf.org/html/rfc9162#section-2.1.3.1
+        """
+
+        size = self._size if size is None else size
+        self._check_size(size)
+
+        if not 0 <= index < size:
+            raise ValueError(f"Invalid leaf index {index} for tree size {size}.")
+
+        proof = []
+        lo, hi = 0, size
+
+        # Descend towards the leaf, collecting the sibling subtrees along the way.
+        while hi - lo > 1:
+            k = split_point(hi - lo)
+
+            if index < lo + k:
+                proof.append(self._subtree(lo + k, hi))
+                hi = lo + k
+            else:
+                proof.append(self._subtree(lo, lo + k))
+                lo = lo + k
+
+        # The path is ordered from the leaf upwards.
+        proof.reverse()
+
+        return proof
+
+    def consistency_proof(self, old_size: int, new_size: Optional[int]=None) -> List[bytes]:
+        """
+        Generate a proof that the log of `new_size` entries (defaults to the current size)
+        is an append-only extension of the log of `old_size` entries.
+
+        The consistency proof is generated as specified here:
+        https://tools.ietf.org/html/rfc9162#section-2.1.4.1
+        """
+
+        new_size = self._size if new_size is None else new_size
+        self._check_size(new_size)
+
+        if not 0 <= old_size <= new_size:
+            raise ValueError(f"Invalid old tree size {old_size} for new tree size {new_size}.")
+
+        if old_size in (0, new_size):
+            return []
+
+        proof = []
+        lo, hi, m = 0, new_size, old_size
+
+        # `complete` is true as long as the old tree is a prefix we have not had to split off.
+        complete = True
+
+        while m != hi - lo:
+            k = split_point(hi - lo)
+
+            if m <= k:
+                proof.append(self._subtree(lo + k, hi))
+                hi = lo + k
+            else:
+                proof.append(self._subtree(lo, lo + k))
+                lo, m = lo + k, m - k
+                complete = False
+
+        if not complete:
+            proof.append(self._subtree(lo, hi))
+
+        proof.reverse()
+
+        return proof
+
+    def flush(self) -> None:
+        self.store.flush()
+
+    def close(self) -> None:
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return f"MerkleLog(size={self._size}, root={self.root().hex()})"
+
+
+def verify_inclusion(digest: bytes, index: int, size: int, proof: List[bytes], root: bytes) -> bool:
+    """
+    Verify the inclusion proof `proof` for the entry with leaf hash `digest` at `index`,
+    in the log of `size` entries with root hash `root`.
+
+    The verification algorithm can be found here:
+    https://tools.ietf.org/html/rfc9162#section-2.1.3.2
+    """
+
+    if not 0 <= index < size:
+        return False
+
+    fn, sn = index, size - 1
+    r = digest
+
+    for p in proof:
+        if sn == 0:
+            return False
+
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+
+            if not fn & 1:
+                while not (fn & 1 or fn == 0):
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+
+        fn >>= 1
+        sn >>= 1
+
+    return sn == 0 and r == root
+
+
+def verify_consistency(old_size: int, new_size: int, old_root: bytes, new_root: bytes, proof: List[bytes]) -> bool:
+    """
+    Verify the consistency proof `proof` between the log of `old_size` entries with root hash `old_root`
+    and the log of `new_size` entries with root hash `new_root`.
+
+    The verification algorithm can be found here:
+    https://tools.ietf.org/html/rfc9162#section-2.1.4.2
+    """
+
+    if not 0 <= old_size <= new_size:
+        return False
+
+    if old_size == new_size:
+        return len(proof) == 0 and old_root == new_root
+
+    # The empty log is a prefix of every log.
+    if old_size == 0:
+        return len(proof) == 0
+
+    # If the old tree is a perfect subtree, its root is the first node of the path.
+    if old_size & (old_size - 1) == 0:
+        proof = [old_root] + list(proof)
+
+    if len(proof) == 0:
+        return False
+
+    fn, sn = old_size - 1, new_size - 1
+
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+
+    fr = sr = proof[0]
+
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+
+            if not fn & 1:
+                while not (fn & 1 or fn == 0):
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+
+        fn >>= 1
+        sn >>= 1
+
+    return fr == old_root and sr == new_root and sn == 0
@@ -1,9 +1,14 @@
+from typing import Tuple
 import struct
-from pws.hash.abstracthash import Hash
 
+from pws.hash.abstracthash import MerkleDamgardHash, register_hash_backends
 
-class SHA1(Hash):
 
+class SHA1(MerkleDamgardHash):
+
+    name = "sha1"
+
+    initial_state = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
 
     @staticmethod
     def pad(data: bytes) -> bytes:
@@ -33,81 +38,56 @@ class SHA1(Hash):
         return padded
 
     
-    def compute_digest(self) -> bytes:
-        
-        # Computing the hash is indeed very similar to MD5.
-        # These two hash algorithms both use the Merkle–Damgård construction
+    # Computing the hash is indeed very similar to MD5.
+    # These two hash algorithms both use the Merkle–Damgård construction
 
-        h_0, h_1, h_2, h_3, h_4 = 0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0
-        padded = self.pad(self._plaintext) 
+    @staticmethod
+    def _compress(state: Tuple[int, ...], data: bytes, offset: int) -> Tuple[int, ...]:
+        return _compress(state, data, offset)
 
-        # Left rotate x by c bits.
-        lr = lambda x, c: ((x << c) | (x >> (32-c)))
-        u32 = lambda x: x & 0xffffffff
-        
-        # For every 512 bit block..
-        for n in range(0, len(padded), 64):
-            
-            block = bytearray(padded[n:n+64])
-            
-
-            def w_get(idx: int) -> int:
-                # Fetch big-endian 32-bit unsigned integer at index `idx` in block.
-                return struct.unpack(">I", block[4*idx:4*(idx+1)])[0]
-            
-            def w_set(idx: int, value: int) -> None:
-                # Set big-endian 32-bit unsigned integer at index `idx` to `value` in block
-                block[4*idx:4*(idx+1)] = struct.pack(">I", u32(value))
-
-            # Extend the sixteen 32-bit words into eighty ones.
-            block.extend(b"\x00" * ((80 - 16) * 4))
-            
-            for i in range(16, 80):
-                w_set(i, lr( (w_get(i - 3) ^ w_get(i - 8) ^ w_get(i - 14) ^ w_get(i - 16)), 1)) 
-            
-            # Initialize hash values for chunk.
-            a, b, c, d, e = h_0, h_1, h_2, h_3, h_4 
-
-            for i in range(0, 80):
-
-                # 60-79
-                if i >= 60:
-                    f = b ^ c ^ d
-                    k = 0xCA62C1D6
-
-                # 40 - 59
-                elif i >= 40:
-                    f = (b & c) | (b & d) | (c & d)
-                    k = 0x8F1BBCDC
-                
-                # 20 - 39
-                elif i >= 20:
-                    f = b ^ c ^ d
-                    k = 0x6ED9EBA1
-                
-                # 0 - 19
-                else:
-                    f = (b & c) | (~b & d)
-                    k = 0x5A827999
-                
-                f = u32(f)
-
-                temp = u32(lr(a, 5) + f + e + k + w_get(i))
-                e = d
-                d = c
-                c = u32(lr(b, 30))
-                b = a
-                a = temp
-            
-            # Add this chunk's hash to result so far
-            h_0 = u32(h_0 + a)
-            h_1 = u32(h_1 + b)
-            h_2 = u32(h_2 + c)
-            h_3 = u32(h_3 + d)
-            h_4 = u32(h_4 + e)
-        
-        # Add it all together in a 160-bit number
-        result = (h_0 << 128) | (h_1 << 96) | (h_2 << 64) | (h_3 << 32) | h_4
-        
+    def _encode_state(self, state: Tuple[int, ...]) -> bytes:
         # Convert it to a sequence of bytes and return.
-        return result.to_bytes(160 // 8, "big")
+        return struct.pack(">5I", *state)
+
+
+def _compress(h: Tuple[int, int, int, int, int], data: bytes, offset: int) -> Tuple[int, int, int, int, int]:
+    """Compress the 64-byte block at `offset` in `data` into the running state `h`."""
+
+    # Fetch all sixteen big-endian 32-bit words of the block at once.
+    w = list(struct.unpack_from(">16I", data, offset))
+    
+    # Extend the sixteen 32-bit words into eighty ones.
+    for i in range(16, 80):
+        x = w[i - 3] ^ w[i - 8] ^ w[i - 14] ^ w[i - 16]
+        w.append(((x << 1) | (x >> 31)) & 0xffffffff)
+
+    a, b, c, d, e = h
+
+    # 0 - 19
+    for x in w[0:20]:
+        temp = ((((a << 5) | (a >> 27)) & 0xffffffff) + (d ^ (b & (c ^ d))) + e + 0x5A827999 + x) & 0xffffffff
+        e, d, c, b, a = d, c, ((b << 30) | (b >> 2)) & 0xffffffff, a, temp
+    
+    # 20 - 39
+    for x in w[20:40]:
+        temp = ((((a << 5) | (a >> 27)) & 0xffffffff) + (b ^ c ^ d) + e + 0x6ED9EBA1 + x) & 0xffffffff
+        e, d, c, b, a = d, c, ((b << 30) | (b >> 2)) & 0xffffffff, a, temp
+
+    # 40 - 59
+    for x in w[40:60]:
+        temp = ((((a << 5) | (a >> 27)) & 0xffffffff) + ((b & c) | (d & (b | c))) + e + 0x8F1BBCDC + x) & 0xffffffff
+        e, d, c, b, a = d, c, ((b << 30) | (b >> 2)) & 0xffffffff, a, temp
+
+    # 60 - 79
+    for x in w[60:80]:
+        temp = ((((a << 5) | (a >> 27)) & 0xffffffff) + (b ^ c ^ d) + e + 0xCA62C1D6 + x) & 0xffffffff
+        e, d, c, b, a = d, c, ((b << 30) | (b >> 2)) & 0xffffffff, a, temp
+    
+    # Add this chunk's hash to result so far
+    return (
+        (h[0] + a) & 0xffffffff, (h[1] + b) & 0xffffffff, (h[2] + c) & 0xffffffff,
+        (h[3] + d) & 0xffffffff, (h[4] + e) & 0xffffffff
+    )
+
+
+register_hash_backends(SHA1)
@@ -1,7 +1,18 @@
+from typing import Tuple, Callable
 import struct
-from pws.hash.abstracthash import Hash
 
-class SHA256(Hash):
+from pws.hash.abstracthash import MerkleDamgardHash, register_hash_backends
+
+class SHA256(MerkleDamgardHash):
+
+    name = "sha256"
+
+    initial_state = (
+        0x6a09e667, 0xbb67ae85,
+        0x3c6ef372, 0xa54ff53a,
+        0x510e527f, 0x9b05688c,
+        0x1f83d9ab, 0x5be0cd19
+    )
 
     constants = [
         0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
@@ -41,61 +52,107 @@ class SHA256(Hash):
 
         return padded
     
-    def compute_digest(self) -> bytes:
-        
-        # initialize the results to the initialization vector.
-        h = [
-            0x6a09e667, 0xbb67ae85, 
-            0x3c6ef372, 0xa54ff53a,
-            0x510e527f, 0x9b05688c,
-            0x1f83d9ab, 0x5be0cd19
-        ]
-
-        padded = self.pad(self._plaintext)
-        
+    @staticmethod
+    def _compress(state: Tuple[int, ...], data: bytes, offset: int) -> Tuple[int, ...]:
+        return _compress(state, data, offset)
 
-        u32 = lambda x: x & ((1 << 32) - 1)
-        # right rotate 32-bit integer `x` by `c` bits.
-        rr = lambda x, c: u32((x >> c) | (x << (32 - c)))
+    def _encode_state(self, state: Tuple[int, ...]) -> bytes:
+        return struct.pack(">8I", *state)
 
-        for n in range(0, len(padded), 64):
-            block = bytearray(padded[n:n+64])
 
-            def w_get(idx: int):
-                return struct.unpack(">I", block[4*idx:4*(idx+1)])[0]
+def _compress_rolled(h: Tuple[int, ...], data: bytes, offset: int) -> Tuple[int, ...]:
+    """
+    Compress the 64-byte block at `offset` in `data` into the running state `h`.
 
-            def w_set(idx: int, value: int) -> None:
-                block[4*idx:4*(idx+1)] = struct.pack(">I", u32(value))
+    This is the readable, rolled-up version of the compression function.
+    It serves as a reference for (and produces the same result as) the unrolled
+    version generated by `_generate_compress`.
+    """
 
-            block.extend(b"\x00" * ((64 - 16) * 4))
+    k = SHA256.constants
+    
+    # Unpack the block once; the message schedule lives in a list of ints.
+    w = list(struct.unpack_from(">16I", data, offset))
+    
+    for i in range(16, 64):
+        x, y = w[i - 15], w[i - 2]
+        s0 = (((x >> 7) | (x << 25)) ^ ((x >> 18) | (x << 14)) ^ (x >> 3)) & 0xffffffff
+        s1 = (((y >> 17) | (y << 15)) ^ ((y >> 19) | (y << 13)) ^ (y >> 10)) & 0xffffffff
+        w.append((w[i - 16] + s0 + w[i - 7] + s1) & 0xffffffff)
+
+    a, b, c, d, e, f, g, h_ = h
+
+    for i in range(64):
+        # The rotations are combined before masking: every term is < 2**64,
+        # so a single mask afterwards yields the same 32-bit result.
+        S1 = (((e >> 6) | (e << 26)) ^ ((e >> 11) | (e << 21)) ^ ((e >> 25) | (e << 7))) & 0xffffffff
+        ch = g ^ (e & (f ^ g))
+        t1 = h_ + S1 + ch + k[i] + w[i]
+        S0 = (((a >> 2) | (a << 30)) ^ ((a >> 13) | (a << 19)) ^ ((a >> 22) | (a << 10))) & 0xffffffff
+        maj = (a & b) | (c & (a | b))
+
+        h_, g, f, e = g, f, e, (d + t1) & 0xffffffff
+        d, c, b, a = c, b, a, (t1 + S0 + maj) & 0xffffffff
+
+    return (
+        (h[0] + a) & 0xffffffff, (h[1] + b) & 0xffffffff,
+        (h[2] + c) & 0xffffffff, (h[3] + d) & 0xffffffff,
+        (h[4] + e) & 0xffffffff, (h[5] + f) & 0xffffffff,
+        (h[6] + g) & 0xffffffff, (h[7] + h_) & 0xffffffff
+    )
+
+
+def _generate_compress() -> Callable[[Tuple[int, ...], bytes, int], Tuple[int, ...]]:
+    """
+    Generate a fully unrolled version of `_compress_rolled`.
+    
+    Every schedule word and every working variable is a plain local, and all
+    round constants are inlined as literals. Instead of shifting the eight
+    working variables through each round, the names are rotated: round `i`
+    only assigns the two variables that actually change.
+    """
+
+    k = SHA256.constants
+    names = ["a", "b", "c", "d", "e", "f", "g", "h_"]
+    
+    lines = [
+        "def _compress(h, data, offset):",
+        "    " + ", ".join(f"w{i}" for i in range(16)) + " = unpack_from('>16I', data, offset)",
+    ]
 
-            for i in range(16, 64):
-                s = (
-                    rr(w_get(i - 15), 7) ^ rr(w_get(i - 15), 18) ^ (w_get(i - 15) >> 3),
-                    rr(w_get(i - 2), 17) ^ rr(w_get(i - 2), 19) ^  (w_get(i - 2) >> 10)
-                )
-                w_set(i, w_get(i - 16) + s[0] + w_get(i - 7) + s[1])
-            
-            a = h.copy()
-            
-            for i in range(64):
-                S1 = rr(a[4], 6) ^ rr(a[4], 11) ^ rr(a[4], 25)
-                ch = (a[4] & a[5]) ^ (~a[4] & a[6])
-                t1 = u32(a[7] + S1 + ch + self.constants[i] + w_get(i))
-                S0 = rr(a[0], 2) ^ rr(a[0], 13) ^ rr(a[0], 22)
-                maj = (a[0] & a[1]) ^ (a[0] & a[2]) ^ (a[1] & a[2])
-                t2 = u32(S0 + maj)
+    for i in range(16, 64):
+        x, y = f"w{i - 15}", f"w{i - 2}"
+        lines.append(
+            f"    w{i} = (w{i - 16} + w{i - 7}"
+            f" + ((({x} >> 7) | ({x} << 25)) ^ (({x} >> 18) | ({x} << 14)) ^ ({x} >> 3))"
+            f" + ((({y} >> 17) | ({y} << 15)) ^ (({y} >> 19) | ({y} << 13)) ^ ({y} >> 10))) & 0xffffffff"
+        )
 
-                for i in range(7, 0, -1):
-                    a[i] = a[i - 1]
-                
-                a[0] = u32(t1 + t2)
+    lines.append("    " + ", ".join(names) + " = h")
 
-                a[4] = u32(a[4] + t1)
+    for i in range(64):
+        a, b, c, d, e, f, g, h = (names[(j - i) % 8] for j in range(8))
+        
+        lines.append(
+            f"    t1 = {h} + ({g} ^ ({e} & ({f} ^ {g}))) + {hex(k[i])} + w{i}"
+            f" + (((({e} >> 6) | ({e} << 26)) ^ (({e} >> 11) | ({e} << 21)) ^ (({e} >> 25) | ({e} << 7))) & 0xffffffff)"
+        )
+        lines.append(f"    {d} = ({d} + t1) & 0xffffffff")
+        lines.append(
+            f"    {h} = (t1 + (({a} & {b}) | ({c} & ({a} | {b})))"
+            f" + (((({a} >> 2) | ({a} << 30)) ^ (({a} >> 13) | ({a} << 19)) ^ (({a} >> 22) | ({a} << 10))) & 0xffffffff)) & 0xffffffff"
+        )
+    
+    # 64 rounds is a multiple of 8, so the names are back in their original positions.
+    lines.append("    return (")
+    lines.append(",\n".join(f"        (h[{i}] + {name}) & 0xffffffff" for i, name in enumerate(names)))
+    lines.append("    )")
 
-            for i in range(8):
-                h[i] = u32(h[i] + a[i])
+    namespace = {"unpack_from": struct.unpack_from}
+    exec("\n".join(lines), namespace)
+    
+    return namespace["_compress"]
 
-        hash_: bytes = b''.join([struct.pack(">I", h[i]) for i in range(8)])
-        return hash_
+_compress = _generate_compress()
 
+register_hash_backends(SHA256)
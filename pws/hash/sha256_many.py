@@ -0,0 +1,104 @@
+from typing import List, Sequence, Dict
+
+from pws.hash.sha256 import SHA256
+
+
+# Messages of more than this many times the median amount of blocks are hashed on their own.
+OUTLIER_FACTOR = 2
+
+
+def _compress_lanes(np, blocks: List[bytes], n_blocks: int) -> bytes:
+    """
+    Run the SHA-256 compression function over `blocks`, padded messages of exactly `n_blocks` blocks
+    each, one per lane. Returns the concatenated digests, in the order of `blocks`.
+    """
+
+    words = np.frombuffer(b"".join(blocks), dtype=">u4").astype(np.uint32).reshape(len(blocks), 16 * n_blocks)
+
+    k = np.array(SHA256.constants, dtype=np.uint32)
+    state = np.tile(np.array(SHA256.initial_state, dtype=np.uint32), (len(blocks), 1))
+
+    # right rotate uint32 array `x` by `c` bits.
+    rr = lambda x, c: (x >> np.uint32(c)) | (x << np.uint32(32 - c))
+
+    # NumPy arithmetic on uint32 arrays wraps around mod 2**32, so no masking is needed.
+    with np.errstate(over="ignore"):
+        for j in range(n_blocks):
+
+            w = [words[:, 16 * j + i] for i in range(16)]
+
+            for i in range(16, 64):
+                x, y = w[i - 15], w[i - 2]
+                s0 = rr(x, 7) ^ rr(x, 18) ^ (x >> np.uint32(3))
+                s1 = rr(y, 17) ^ rr(y, 19) ^ (y >> np.uint32(10))
+                w.append(w[i - 16] + s0 + w[i - 7] + s1)
+
+            a, b, c, d, e, f, g, h = (state[:, i] for i in range(8))
+
+            for i in range(64):
+                S1 = rr(e, 6) ^ rr(e, 11) ^ rr(e, 25)
+                ch = g ^ (e & (f ^ g))
+                t1 = h + S1 + ch + k[i] + w[i]
+                S0 = rr(a, 2) ^ rr(a, 13) ^ rr(a, 22)
+                maj = (a & b) | (c & (a | b))
+
+                h, g, f, e = g, f, e, d + t1
+                d, c, b, a = c, b, a, t1 + S0 + maj
+
+            state += np.stack((a, b, c, d, e, f, g, h), axis=1)
+
+    return state.astype(">u4").tobytes()
+
+
+def sha256_many(messages: Sequence[bytes]) -> List[bytes]:
+    """
+    Compute the SHA-256 digests of many independent `messages` at once.
+
+    Every message occupies one "lane" of a uint32 NumPy matrix, and the compression
+    function is run across all lanes simultaneously using vectorized add, rotate and
+    boolean operations. This pays off when hashing large batches of small messages,
+    where the interpreter overhead of `SHA256(m).digest` dominates.
+
+    The messages are grouped by their number of blocks, and every group is hashed in lanes
+    of its own, so no lane is ever padded out to a longer message. Outliers of more than
+    `OUTLIER_FACTOR` times the median number of blocks, and groups of a single message,
+    are hashed with the scalar `SHA256` instead.
+
+    This function requires NumPy, which is an optional dependency (`pip install pws[fast]`).
+    The digests are returned in the same order as `messages`.
+    """
+
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("sha256_many requires NumPy. Install it using `pip install numpy`.")
+
+    if len(messages) == 0:
+        return []
+
+    padded = [SHA256.pad(bytes(m)) for m in messages]
+
+    sizes = sorted(len(p) for p in padded)
+    limit = OUTLIER_FACTOR * sizes[len(sizes) // 2]
+
+    # n_blocks -> indices of the messages of that many blocks
+    groups: Dict[int, List[int]] = {}
+
+    for i, p in enumerate(padded):
+        groups.setdefault(len(p) // 64, []).append(i)
+
+    result = [b""] * len(messages)
+
+    for n_blocks, indices in groups.items():
+
+        if len(indices) == 1 or 64 * n_blocks > limit:
+            for i in indices:
+                result[i] = SHA256(bytes(messages[i])).digest
+            continue
+
+        digests = _compress_lanes(np, [padded[i] for i in indices], n_blocks)
+
+        for row, i in enumerate(indices):
+            result[i] = digests[32 * row:32 * (row + 1)]
+
+    return result
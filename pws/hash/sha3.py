@@ -0,0 +1,244 @@
+from typing import Optional, List, Callable
+import struct
+
+from pws.hash.abstracthash import Hash, register_hash_backends
+
+
+# Round constants for the iota step, one per round.
+ROUND_CONSTANTS = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808a, 0x8000000080008000,
+    0x000000000000808b, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008a, 0x0000000000000088, 0x0000000080008009, 0x000000008000000a,
+    0x000000008000808b, 0x800000000000008b, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800a, 0x800000008000000a,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008
+)
+
+# Rotation offsets for the rho step, indexed [x][y].
+ROTATION_OFFSETS = (
+    ( 0, 36,  3, 41, 18),
+    ( 1, 44, 10, 45,  2),
+    (62,  6, 43, 15, 61),
+    (28, 55, 25, 21, 56),
+    (27, 20, 39,  8, 14)
+)
+
+
+def _generate_keccak_f() -> Callable[[List[int]], List[int]]:
+    """
+    Generate the Keccak-f[1600] permutation, operating on a list of 25 64-bit lanes (lane (x, y) at index x + 5y).
+
+    The round loop is kept, but the body of a round is fully unrolled:
+    every lane is a plain local, and the rho and pi steps are resolved into the variable names.
+    """
+
+    M = "0xffffffffffffffff"
+
+    def rotl(name: str, n: int) -> str:
+        if n == 0:
+            return name
+        return f"((({name} << {n}) | ({name} >> {64 - n})) & {M})"
+
+    a = [f"a{i}" for i in range(25)]
+    b = [f"b{i}" for i in range(25)]
+
+    lines = [
+        "def _keccak_f(lanes):",
+        "    " + ", ".join(a) + " = lanes",
+        "    for rc in ROUND_CONSTANTS:",
+    ]
+
+    # theta
+    for x in range(5):
+        lines.append(f"        c{x} = " + " ^ ".join(a[x + 5 * y] for y in range(5)))
+    for x in range(5):
+        lines.append(f"        d{x} = c{(x - 1) % 5} ^ {rotl(f'c{(x + 1) % 5}', 1)}")
+
+    # theta (cont.), rho and pi: B[y, 2x + 3y] = rot(A[x, y] ^ D[x], r[x, y])
+    for x in range(5):
+        for y in range(5):
+            lines.append(f"        t = {a[x + 5 * y]} ^ d{x}")
+            lines.append(f"        {b[y + 5 * ((2 * x + 3 * y) % 5)]} = {rotl('t', ROTATION_OFFSETS[x][y])}")
+
+    # chi
+    for y in range(5):
+        for x in range(5):
+            lines.append(f"        {a[x + 5 * y]} = {b[x + 5 * y]} ^ (({b[(x + 1) % 5 + 5 * y]} ^ {M}) & {b[(x + 2) % 5 + 5 * y]})")
+
+    # iota
+    lines.append("        a0 ^= rc")
+
+    lines.append("    return [" + ", ".join(a) + "]")
+
+    namespace = {"ROUND_CONSTANTS": ROUND_CONSTANTS}
+    exec("\n".join(lines), namespace)
+
+    return namespace["_keccak_f"]
+
+_keccak_f = _generate_keccak_f()
+
+
+class Keccak(Hash):
+    """
+    Abstract Keccak sponge class. Only for inheritance
+
+    The sponge absorbs the message `rate` bytes at a time into a 1600-bit state,
+    applying the Keccak-f[1600] permutation after every block. Output is then
+    squeezed out of the state `rate` bytes at a time, so any output length can be produced.
+
+    The SHA-3 standard (FIPS 202) can be found here:
+    https://nvlpubs.nist.gov/nistpubs/FIPS/NIST.FIPS.202.pdf
+    """
+
+    # Amount of bytes absorbed / squeezed per permutation.
+    rate: int = 136
+
+    # Domain separation bits, followed by the first bit of the padding.
+    suffix: int = 0x06
+
+    digest_size: int = 32
+
+    def __init__(self, first: Optional[bytes]=None):
+        self._lanes: List[int] = [0] * 25
+        self._buffer: bytes = b""
+
+        super(Keccak, self).__init__(first)
+
+    def _update(self, data: bytes):
+        if self._buffer:
+            data = self._buffer + data
+
+        rate = self.rate
+        n_full = len(data) - (len(data) % rate)
+
+        self._lanes = self._absorb(self._lanes, data, n_full)
+        self._buffer = bytes(data[n_full:])
+
+    def _absorb(self, lanes: List[int], data: bytes, length: int) -> List[int]:
+        """Absorb the first `length` bytes (a multiple of the rate) of `data` into `lanes`."""
+
+        rate = self.rate
+        fmt = f"<{rate // 8}Q"
+
+        # Never modify the lanes in place: they may be shared with a copy of this object.
+        lanes = list(lanes)
+
+        for n in range(0, length, rate):
+            for i, word in enumerate(struct.unpack_from(fmt, data, n)):
+                lanes[i] ^= word
+
+            lanes = _keccak_f(lanes)
+
+        return lanes
+
+    def squeeze(self, length: int) -> bytes:
+        """
+        Produce `length` bytes of output for the data absorbed so far.
+
+        For extendable-output functions (SHAKE), any `length` can be requested,
+        and shorter outputs are prefixes of longer ones.
+        With an accelerated backend, the fixed-length SHA-3 hashes only produce up to `digest_size` bytes.
+        """
+
+        if self._accel is not None:
+            if length > self.digest_size:
+                raise ValueError(f"Cannot squeeze more than {self.digest_size} bytes from the active {self.name} backend.")
+
+            return self._accel.digest()[:length]
+
+        rate = self.rate
+
+        # Pad the final block: the suffix bits, zeroes, and a final `1` bit.
+        block = bytearray(self._buffer.ljust(rate, b"\x00"))
+        block[len(self._buffer)] ^= self.suffix
+        block[rate - 1] ^= 0x80
+
+        # Finish on a copy of the state, so that more data can be added later on.
+        lanes = self._absorb(self._lanes, bytes(block), rate)
+
+        fmt = f"<{rate // 8}Q"
+        output = bytearray()
+
+        while True:
+            output += struct.pack(fmt, *lanes[:rate // 8])
+
+            if len(output) >= length:
+                return bytes(output[:length])
+
+            lanes = _keccak_f(lanes)
+
+    def compute_digest(self) -> bytes:
+        return self.squeeze(self.digest_size)
+
+
+class SHA3_224(Keccak):
+    name = "sha3_224"
+    rate = 144
+    digest_size = 28
+
+
+class SHA3_256(Keccak):
+    name = "sha3_256"
+    rate = 136
+    digest_size = 32
+
+
+class SHA3_384(Keccak):
+    name = "sha3_384"
+    rate = 104
+    digest_size = 48
+
+
+class SHA3_512(Keccak):
+    name = "sha3_512"
+    rate = 72
+    digest_size = 64
+
+
+class SHAKE(Keccak):
+    """
+    Abstract SHAKE class. Only for inheritance
+
+    SHAKE is an extendable-output function (XOF): use `squeeze` to obtain output of any length.
+    `digest` returns `digest_size` bytes of output, which can be set on construction.
+    """
+
+    suffix = 0x1f
+
+    # Check the backends on output longer than the rate as well.
+    selftest_params = [{"digest_size": 500}]
+
+    def __init__(self, first: Optional[bytes]=None, digest_size: Optional[int]=None):
+        if digest_size is not None:
+            self.digest_size = digest_size
+
+        super(SHAKE, self).__init__(first)
+
+    def squeeze(self, length: int) -> bytes:
+        if self._accel is not None:
+            return self._accel.digest(length)
+
+        return super(SHAKE, self).squeeze(length)
+
+    def _accel_digest(self) -> bytes:
+        return self._accel.digest(self.digest_size)
+
+
+class SHAKE128(SHAKE):
+    name = "shake_128"
+    rate = 168
+    digest_size = 32
+
+
+class SHAKE256(SHAKE):
+    name = "shake_256"
+    rate = 136
+    digest_size = 64
+
+
+register_hash_backends(SHA3_224)
+register_hash_backends(SHA3_256)
+register_hash_backends(SHA3_384)
+register_hash_backends(SHA3_512)
+register_hash_backends(SHAKE128)
+register_hash_backends(SHAKE256)
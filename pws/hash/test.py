@@ -1,13 +1,65 @@
 from pws.hash.md5 import MD5
 from pws.hash.sha1 import SHA1
 from pws.hash.sha256 import SHA256
+from pws.hash.sha512 import SHA512, SHA384, SHA512_256
+from pws.hash.blake2 import BLAKE2b, BLAKE2s
+from pws.hash.sha3 import SHA3_224, SHA3_256, SHA3_384, SHA3_512, SHAKE128, SHAKE256
+from pws.hash.sha256_many import sha256_many
+from pws.hash.merkle import leaf_hash, merkle_root
+from pws.hash.treehash import tree_hash
+from pws.hash.files import ALGORITHMS, hash_file, hash_files, format_line, parse_line
+from pws.hash.merklelog import MerkleLog, FileNodeStore, verify_inclusion, verify_consistency
 
-from typing import Type
+from pws.testing import Check, do_checks
+
+from typing import Type, Iterable
 
 import hashlib
 
 TheirHash = hashlib._hashlib.HASH
 
+# A message of two SHA-512 blocks.
+TWO_LONG_BLOCKS = b"abcdefghbcdefghicdefghijdefghijkefghijklfghijklmghijklmnhijklmnoijklmnopjklmnopqklmnopqrlmnopqrsmnopqrstnopqrstu"
+
+# (hash, message, hex digest), from the FIPS 180-4 and FIPS 202 examples and RFC 7693.
+# SHAKE128 and SHAKE256 with their default output of 32 and 64 bytes.
+KNOWN_ANSWERS = [
+    (SHA384, b"", "38b060a751ac96384cd9327eb1b1e36a21fdb71114be07434c0cc7bf63f6e1da274edebfe76f65fbd51ad2f14898b95b"),
+    (SHA384, b"abc", "cb00753f45a35e8bb5a03d699ac65007272c32ab0eded1631a8b605a43ff5bed8086072ba1e7cc2358baeca134c825a7"),
+    (SHA384, TWO_LONG_BLOCKS, "09330c33f71147e83d192fc782cd1b4753111b173b3b05d22fa08086e3b0f712fcc7c71a557e2db966c3e9fa91746039"),
+    (SHA512, b"", "cf83e1357eefb8bdf1542850d66d8007d620e4050b5715dc83f4a921d36ce9ce47d0d13c5d85f2b0ff8318d2877eec2f63b931bd47417a81a538327af927da3e"),
+    (SHA512, b"abc", "ddaf35a193617abacc417349ae20413112e6fa4e89a97ea20a9eeee64b55d39a2192992a274fc1a836ba3c23a3feebbd454d4423643ce80e2a9ac94fa54ca49f"),
+    (SHA512, TWO_LONG_BLOCKS, "8e959b75dae313da8cf4f72814fc143f8f7779c6eb9f7fa17299aeadb6889018501d289e4900f7e4331b99dec4b5433ac7d329eeb6dd26545e96e55b874be909"),
+    (SHA512_256, b"", "c672b8d1ef56ed28ab87c3622c5114069bdd3ad7b8f9737498d0c01ecef0967a"),
+    (SHA512_256, b"abc", "53048e2681941ef99b2e29b76b4c7dabe4c2d0c634fc6d46e0e2f13107e7af23"),
+    (SHA512_256, TWO_LONG_BLOCKS, "3928e184fb8690f840da3988121d31be65cb9d3ef83ee6146feac861e19b563a"),
+    (BLAKE2b, b"", "786a02f742015903c6c6fd852552d272912f4740e15847618a86e217f71f5419d25e1031afee585313896444934eb04b903a685b1448b755d56f701afe9be2ce"),
+    (BLAKE2b, b"abc", "ba80a53f981c4d0d6a2797b69f12f6e94c212f14685ac4b74b12bb6fdbffa2d17d87c5392aab792dc252d5de4533cc9518d38aa8dbf1925ab92386edd4009923"),
+    (BLAKE2s, b"", "69217a3079908094e11121d042354a7c1f55b6482ca1a51e1b250dfd1ed0eef9"),
+    (BLAKE2s, b"abc", "508c5e8c327c14e2e1a72ba34eeb452f37458b209ed63a294d999b4c86675982"),
+    (SHA3_224, b"", "6b4e03423667dbb73b6e15454f0eb1abd4597f9a1b078e3f5b5a6bc7"),
+    (SHA3_224, b"abc", "e642824c3f8cf24ad09234ee7d3c766fc9a3a5168d0c94ad73b46fdf"),
+    (SHA3_256, b"", "a7ffc6f8bf1ed76651c14756a061d662f580ff4de43b49fa82d80a4b80f8434a"),
+    (SHA3_256, b"abc", "3a985da74fe225b2045c172d6bd390bd855f086e3e9d525b46bfe24511431532"),
+    (SHA3_384, b"", "0c63a75b845e4f7d01107d852e4c2485c51a50aaaa94fc61995e71bbee983a2ac3713831264adb47fb6bd1e058d5f004"),
+    (SHA3_384, b"abc", "ec01498288516fc926459f58e2c6ad8df9b473cb0fc08c2596da7cf0e49be4b298d88cea927ac7f539f1edf228376d25"),
+    (SHA3_512, b"", "a69f73cca23a9ac5c8b567dc185a756e97c982164fe25859e0d1dcc1475c80a615b2123af1f5f94c11e3e9402c3ac558f500199d95b6d3e301758586281dcd26"),
+    (SHA3_512, b"abc", "b751850b1a57168a5693cd924b6b096e08f621827444f70d884f5d0240d2712e10e116e9192af3c91a7ec57647e3934057340b4cf408d5a56592f8274eec53f0"),
+    (SHAKE128, b"", "7f9c2ba4e88f827d616045507605853ed73b8093f6efbc88eb1a6eacfa66ef26"),
+    (SHAKE128, b"abc", "5881092dd818bf5cf8a3ddb793fbcba74097d5c526a6d35f97b83351940f2cc8"),
+    (SHAKE256, b"", "46b9dd2b0ba88d13233b3feb743eeb243fcd52ea62b81b82b50c27646ed5762fd75dc4ddd8c0f200cb05019d67b592f6fc821c49479ab48640292eacb3b7c4be"),
+    (SHAKE256, b"abc", "483366601360a8771c6863080cc4114d8db44530f8f1e1ee4f94ea37e78b5739d5a15bef186a5386c75744c0527e1faa9f8726e462a12a4feb06bd8801e751e4"),
+]
+
+# (hash, key length, message length, hex digest), from the BLAKE2 reference test vectors (blake2b-kat.txt, blake2s-kat.txt):
+# the key is bytes(range(key length)), and the message bytes(range(message length)).
+BLAKE2_KEYED_ANSWERS = [
+    (BLAKE2b, 64, 0, "10ebb67700b1868efb4417987acf4690ae9d972fb7a590c2f02871799aaa4786b5e996e8f0f4eb981fc214b005f42d2ff4233499391653df7aefcbc13fc51568"),
+    (BLAKE2b, 64, 255, "142709d62e28fcccd0af97fad0f8465b971e82201dc51070faa0372aa43e92484be1c1e73ba10906d5d1853db6a4106e0a7bf9800d373d6dee2d46d62ef2a461"),
+    (BLAKE2s, 32, 0, "48a8997da407876b3d79c0d92325ad3b89cbb754d86ab71aee047ad345fd2c49"),
+    (BLAKE2s, 32, 255, "3fb735061abc519dfe979e54c1ee5bfad0a9d858b3315bad34bde999efd724dd"),
+]
+
 def do_test(hash_name: str, our_hash: Type['OurHash'], their_hash: Type[TheirHash], **kwargs):
 
     print(f"[+] {hash_name} demo:")
@@ -46,21 +98,243 @@ def do_test(hash_name: str, our_hash: Type['OurHash'], their_hash: Type[TheirHas
     print("-"*80)
     print(f"{n_success}/{n_blobs} blobs sucessfully hashed with hash {hash_name}")
 
+# RFC 6962 Merkle tree roots of the first 1, 2, .., 8 of these leaves, from the Certificate Transparency reference tests.
+MERKLE_LEAVES = ["", "00", "10", "2021", "3031", "40414243", "5051525354555657", "606162636465666768696a6b6c6d6e6f"]
+MERKLE_ROOTS = [
+    "6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d",
+    "fac54203e7cc696cf0dfcb42c92a1d9dbaf70ad9e621f4bd8d98662f00e3c125",
+    "aeb6bcfe274b70a14fb067a5e5578264db0fa9b51af5e0ba159158f329e06e77",
+    "d37ee418976dd95753c1c73862b9398fa2a2cf9b4ff0fdfe8b30cd95209614b7",
+    "4e3bbb1f7b478dcfe71fb631631519a3bca12c9aefca1612bfce4c13a86264d4",
+    "76e67dadbcdf1e10e1b74ddc608abd2f98dfb16fbce75277b5232a127f2087ef",
+    "ddb89be403809e325750d3d263cd78929c2942b7942a34b77e122c9594a74c8c",
+    "5dc9da79a70659a9ad559cb701ded9a2ab9d823aad2f4960cfe370eff4604328",
+]
+
+
+def known_answer_checks() -> Iterable[Check]:
+    for our_hash, message, digest in KNOWN_ANSWERS:
+        yield f"{our_hash.__name__} of {len(message)} bytes", our_hash(message).hexdigest, digest
+
+        # The same message, fed in pieces.
+        h = our_hash()
+        for i in range(0, len(message), 7):
+            h.update(message[i:i + 7])
+
+        yield f"{our_hash.__name__} of {len(message)} bytes, in pieces", h.hexdigest, digest
+
+
+def blake2_checks() -> Iterable[Check]:
+    import secrets
+
+    for our_hash, key_length, length, digest in BLAKE2_KEYED_ANSWERS:
+        yield f"{our_hash.__name__} of {length} bytes, with a {key_length}-byte key", our_hash(bytes(range(length)), key=bytes(range(key_length))).hexdigest, digest
+
+    # Every parameter against hashlib: message lengths around the block size, digest sizes, keys, salts and personalization.
+    for our_hash, their_hash in [(BLAKE2b, hashlib.blake2b), (BLAKE2s, hashlib.blake2s)]:
+        for length in [0, 1, our_hash.block_size - 1, our_hash.block_size, our_hash.block_size + 1, 1000]:
+            message = secrets.token_bytes(length)
+            params = {
+                "digest_size": secrets.choice(range(1, our_hash.max_digest_size + 1)),
+                "key": secrets.token_bytes(secrets.choice(range(our_hash.max_digest_size + 1))),
+                "salt": secrets.token_bytes(our_hash.word_bits // 4),
+                "person": secrets.token_bytes(our_hash.word_bits // 8),
+            }
+
+            yield f"{our_hash.__name__} of {length} bytes, with random parameters", our_hash(message, **params).hexdigest, their_hash(message, **params).hexdigest()
+
+
+def shake_checks() -> Iterable[Check]:
+    import secrets
+    from pws.asymmetric.rsa.pad import mgf_shake128, mgf_shake256
+
+    for our_hash, their_hash, mgf in [(SHAKE128, hashlib.shake_128, mgf_shake128), (SHAKE256, hashlib.shake_256, mgf_shake256)]:
+        # Message lengths around the rate, and outputs of several permutations.
+        for length in [0, our_hash.rate - 1, our_hash.rate, our_hash.rate + 1]:
+            message = secrets.token_bytes(length)
+
+            for size in [1, our_hash.rate, 3 * our_hash.rate + 5]:
+                yield f"{our_hash.__name__} of {length} bytes, squeezing {size} bytes", our_hash(message).squeeze(size), their_hash(message).digest(size)
+
+            yield f"{our_hash.__name__} of {length} bytes, with digest_size 100", our_hash(message, digest_size=100).hexdigest, their_hash(message).hexdigest(100)
+
+        seed = secrets.token_bytes(32)
+        yield f"{mgf.__name__} mask of 500 bytes", mgf(seed, 500), their_hash(seed).digest(500)
+
+
+def backend_checks() -> Iterable[Check]:
+    from pws import backend
+
+    # The known answers again, with every hash delegating to hashlib (which runs its self-test first).
+    for our_hash in {our_hash: None for our_hash, _, _ in KNOWN_ANSWERS}:
+        if "hashlib" not in backend.available(our_hash.name):
+            print(f"[*] No hashlib backend for {our_hash.name}, skipped")
+            continue
+
+        backend.use(our_hash.name, "hashlib")
+
+    yield from known_answer_checks()
+
+    h = BLAKE2b(b"abc", key=b"key", digest_size=20)
+    yield "BLAKE2b with a key through hashlib", (h._accel is not None, h.hexdigest), (True, hashlib.blake2b(b"abc", key=b"key", digest_size=20).hexdigest())
+
+    h = SHAKE128(b"abc")
+    yield "SHAKE128 squeeze through hashlib", (h._accel is not None, h.squeeze(1000)), (True, hashlib.shake_128(b"abc").digest(1000))
+
+
+def sha256_many_checks() -> Iterable[Check]:
+    import secrets
+
+    # Lengths around the padding boundaries, some of them repeated so that they share lanes, and an outlier.
+    lengths = [0, 1, 55, 56, 63, 64, 119, 120, 1000] * 3 + [5000]
+    messages = [secrets.token_bytes(length) for length in lengths]
+
+    try:
+        digests = sha256_many(messages)
+    except ImportError:
+        print("[*] NumPy is not installed, skipping sha256_many")
+        return
+
+    for message, digest in zip(messages, digests):
+        yield f"sha256_many lane of {len(message)} bytes", digest.hex(), hashlib.sha256(message).hexdigest()
+
+    yield "sha256_many of no messages", sha256_many([]), []
+
+
+def treehash_checks() -> Iterable[Check]:
+    import secrets
+    import tempfile
+
+    leaves = [leaf_hash(bytes.fromhex(leaf)) for leaf in MERKLE_LEAVES]
+
+    for size, root in enumerate(MERKLE_ROOTS, 1):
+        yield f"merkle_root of {size} RFC 6962 leaves", merkle_root(leaves[:size]).hex(), root
+
+    chunk_size = 1000
+    data = secrets.token_bytes(10500)
+
+    def expected(data: bytes):
+        return merkle_root([leaf_hash(data[i:i + chunk_size]) for i in range(0, len(data), chunk_size)]).hex()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/data"
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+        for workers in [1, 2]:
+            root, leaves = tree_hash(path, chunk_size=chunk_size, workers=workers)
+            yield f"tree_hash of {len(data)} bytes with {workers} workers", root.hex(), expected(data)
+
+        # Rehash incrementally after the file shrinks to the middle of a leaf, then after it grows again.
+        for new_data in [data[:7300], data[:7300] + secrets.token_bytes(2500)]:
+            with open(path, "wb") as f:
+                f.write(new_data)
+
+            root, leaves = tree_hash(path, chunk_size=chunk_size, workers=1, leaves=leaves)
+            yield f"incremental tree_hash after resizing to {len(new_data)} bytes", root.hex(), expected(new_data)
+
+
+def merklelog_checks() -> Iterable[Check]:
+    import tempfile
+
+    leaves = [bytes.fromhex(leaf) for leaf in MERKLE_LEAVES]
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = MerkleLog(FileNodeStore(directory))
+
+        for leaf in leaves[:5]:
+            log.append(leaf)
+
+        # Reopen the log from disk halfway through.
+        log.close()
+        log = MerkleLog(FileNodeStore(directory))
+
+        for leaf in leaves[5:]:
+            log.append(leaf)
+
+        for size, root in enumerate(MERKLE_ROOTS, 1):
+            yield f"MerkleLog root of size {size}", log.root(size).hex(), root
+
+        for size in range(1, len(leaves) + 1):
+            root = log.root(size)
+
+            yield f"inclusion proofs in tree of size {size}", [
+                verify_inclusion(log.leaf_hash(i), i, size, log.inclusion_proof(i, size), root) for i in range(size)
+            ], [True] * size
+
+            yield f"consistency proofs with tree of size {size}", [
+                verify_consistency(old, size, log.root(old), root, log.consistency_proof(old, size)) for old in range(1, size + 1)
+            ], [True] * size
+
+        # Proofs for the wrong leaf or the wrong old root should fail.
+        proof = log.inclusion_proof(2, 8)
+        yield "inclusion proof of the wrong leaf", verify_inclusion(log.leaf_hash(3), 2, 8, proof, log.root(8)), False
+
+        proof = log.consistency_proof(3, 8)
+        yield "consistency proof from the wrong root", verify_consistency(3, 8, log.root(4), log.root(8), proof), False
+
+        log.close()
+
+
+def files_checks() -> Iterable[Check]:
+    import secrets
+    import tempfile
+    import os
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.mkdir(f"{directory}/sub")
+
+        contents = {f"{directory}/{name}": secrets.token_bytes(size) for name, size in [("a", 0), ("b", 100), ("sub/c", 70000)]}
+
+        for path, data in contents.items():
+            with open(path, "wb") as f:
+                f.write(data)
+
+        for algo in ALGORITHMS:
+            yield f"hash_file with {algo}", [hash_file(path, algo, chunk_size=4096) for path in contents], [hashlib.new(algo, data).hexdigest() for data in contents.values()]
+
+        # Directories are walked recursively, in a pool of workers.
+        yield "hash_files of a directory", sorted(hash_files([directory], workers=2)), sorted((path, hashlib.sha256(data).hexdigest()) for path, data in contents.items())
+
+    # Lines as written by GNU sha256sum.
+    empty = hashlib.sha256(b"").hexdigest()
+
+    for path, line in [("plain name", f"{empty}  plain name"), ("new\nline", f"\\{empty}  new\\nline"), ("back\\slash", f"\\{empty}  back\\\\slash")]:
+        yield f"format_line of {path!r}", format_line(path, empty), line
+        yield f"parse_line of {line!r}", parse_line(line), (path, empty)
+
+
+# Checks to run instead of the hashlib comparison, by name.
+CHECKS = {
+    "kat": known_answer_checks,
+    "blake2": blake2_checks,
+    "shake": shake_checks,
+    "backends": backend_checks,
+    "sha256_many": sha256_many_checks,
+    "treehash": treehash_checks,
+    "merklelog": merklelog_checks,
+    "files": files_checks,
+}
+
 
 if __name__ == "__main__":
     import argparse
+    import sys
 
     parser = argparse.ArgumentParser(
             description=f"Hash Testing module",
             formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     
-    parser.add_argument("hash", choices=["md5", "sha1", "sha256"], type=str, help="Hashing algorithm to test.")
+    parser.add_argument("hash", choices=["md5", "sha1", "sha256", "sha384", "sha512", "sha512_256", "blake2b", "blake2s", "sha3_224", "sha3_256", "sha3_384", "sha3_512"] + list(CHECKS), type=str, help="Hashing algorithm to test against hashlib, or checks to run (kat: known answers).")
     parser.add_argument("--blobs", type=int, help="Amount of random plaintext blobs to generate.", default=32)
     parser.add_argument("--min-size", type=int, help="Minimum blob size.", default=128)
     parser.add_argument("--max-size", type=int, help="Maximum blob size.", default=2048)
 
     args = parser.parse_args()
     
+    if args.hash in CHECKS:
+        sys.exit(0 if do_checks(args.hash, CHECKS[args.hash]()) else 1)
 
     if args.hash == "sha1":
         name, our, their = "SHA-1", SHA1, hashlib.sha1
@@ -68,6 +342,24 @@ if __name__ == "__main__":
         name, our, their = "MD5", MD5, hashlib.md5
     elif args.hash == "sha256":
         name, our, their = "SHA-256", SHA256, hashlib.sha256
+    elif args.hash == "sha384":
+        name, our, their = "SHA-384", SHA384, hashlib.sha384
+    elif args.hash == "sha512":
+        name, our, their = "SHA-512", SHA512, hashlib.sha512
+    elif args.hash == "sha512_256":
+        name, our, their = "SHA-512/256", SHA512_256, lambda data: hashlib.new("sha512_256", data)
+    elif args.hash == "blake2b":
+        name, our, their = "BLAKE2b", BLAKE2b, hashlib.blake2b
+    elif args.hash == "blake2s":
+        name, our, their = "BLAKE2s", BLAKE2s, hashlib.blake2s
+    elif args.hash == "sha3_224":
+        name, our, their = "SHA3-224", SHA3_224, hashlib.sha3_224
+    elif args.hash == "sha3_256":
+        name, our, their = "SHA3-256", SHA3_256, hashlib.sha3_256
+    elif args.hash == "sha3_384":
+        name, our, their = "SHA3-384", SHA3_384, hashlib.sha3_384
+    elif args.hash == "sha3_512":
+        name, our, their = "SHA3-512", SHA3_512, hashlib.sha3_512
 
     do_test(hash_name=name, our_hash=our, their_hash=their, n_blobs=args.blobs, blob_range=(args.min_size, args.max_size))
 
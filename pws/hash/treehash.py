@@ -0,0 +1,106 @@
+from typing import Optional, List, Tuple, Iterable
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+
+from pws.hash.merkle import leaf_hash, merkle_root
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Memory map of the file being hashed, opened once per worker process.
+_worker_map: Optional[mmap.mmap] = None
+
+
+def _open_map(path: str) -> Optional[mmap.mmap]:
+    """Memory-map the file at `path` read-only. Returns None for empty files, which cannot be mapped."""
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+
+        # The mapping stays valid after the file object is closed.
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _init_worker(path: str) -> None:
+    global _worker_map
+    _worker_map = _open_map(path)
+
+
+def _hash_leaves(map_: mmap.mmap, chunk_size: int, indices: List[int]) -> List[bytes]:
+    """Hash the leaves at `indices` of the memory-mapped file `map_`."""
+
+    return [leaf_hash(map_[i * chunk_size:(i + 1) * chunk_size]) for i in indices]
+
+
+def _worker_hash_leaves(chunk_size: int, indices: List[int]) -> List[bytes]:
+    return _hash_leaves(_worker_map, chunk_size, indices)
+
+
+def tree_hash(
+        path: str,
+        chunk_size: int=DEFAULT_CHUNK_SIZE,
+        workers: Optional[int]=None,
+        leaves: Optional[List[bytes]]=None,
+        changed: Optional[Iterable[int]]=None
+        ) -> Tuple[bytes, List[bytes]]:
+    """
+    Compute the Merkle tree hash of the file at `path`.
+
+    The file is memory-mapped and split into leaves of `chunk_size` bytes (the last one may be shorter).
+    The leaves are hashed in a pool of `workers` processes (defaults to the amount of CPUs; 1 hashes
+    in the current process), then combined into a Merkle tree root using domain-separated
+    interior nodes (see ./merkle.py).
+
+    Returns a tuple (root, leaves), with `leaves` the list of leaf digests.
+
+    If the per-leaf digests `leaves` of an earlier run are supplied (with the same `chunk_size`),
+    only the leaves with indices in `changed`, and any leaves past the end of `leaves`, are rehashed.
+    The last of the previous leaves is always rehashed as well, since it may have been a partial
+    chunk that was appended to, and so is the current last leaf, since the file may have shrunk
+    to end in the middle of a leaf that used to be full.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("Invalid chunk size. Should be a positive integer.")
+
+    size = os.path.getsize(path)
+    n_leaves = (size + chunk_size - 1) // chunk_size
+
+    if leaves is None:
+        result: List[Optional[bytes]] = [None] * n_leaves
+        to_hash = list(range(n_leaves))
+    else:
+        # Reuse the previous digests (of the leaves that still exist), except for the changed ones,
+        # the previous and current last leaf, and any new leaves.
+        result = (list(leaves[:n_leaves]) + [None] * n_leaves)[:n_leaves]
+        to_hash = set(i for i in (changed or ()) if 0 <= i < n_leaves)
+        to_hash.update(range(max(len(leaves) - 1, 0), n_leaves))
+
+        if n_leaves:
+            to_hash.add(n_leaves - 1)
+        to_hash = sorted(to_hash)
+
+    if to_hash:
+        workers = workers or os.cpu_count() or 1
+
+        # Hand every worker a few large batches rather than many single leaves.
+        batch_size = max(1, len(to_hash) // (4 * workers))
+        batches = [to_hash[i:i + batch_size] for i in range(0, len(to_hash), batch_size)]
+
+        if workers == 1 or len(batches) == 1:
+            map_ = _open_map(path)
+            try:
+                digests = [_hash_leaves(map_, chunk_size, batch) for batch in batches]
+            finally:
+                map_.close()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,)) as pool:
+                digests = list(pool.map(_worker_hash_leaves, [chunk_size] * len(batches), batches))
+
+        for batch, batch_digests in zip(batches, digests):
+            for i, digest in zip(batch, batch_digests):
+                result[i] = digest
+
+    return merkle_root(result), result
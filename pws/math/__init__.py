@@ -2,10 +2,15 @@ from pws.math.gcd import gcd
 from pws.math.lcm import lcm
 from pws.math.egcd import egcd
 from pws.math.pow import int_pow
-from pws.math.crt import crt
+from pws.math.modcontext import ModContext
+from pws.math.fixedbase import FixedBaseExp
+from pws.math.multipow import multi_pow
+from pws.math.crt import crt, CRTContext
+from pws.math.prodtree import product_tree, remainder_tree
 from pws.math.prod import prod
-from pws.math.modinv import modinv
+from pws.math.modinv import modinv, batch_modinv, NotInvertibleError
 from pws.math.modsqrt import modsqrt
-from pws.math.lincongr import solve_lincongr 
+from pws.math.lincongr import solve_lincongr, iter_lincongr_solutions
+from pws.math.sieve import primes_up_to, iter_primes, iter_rough, small_primes, prime_products
 from pws.math.gf2 import GF2, GF2Element
 from pws.math.ec import ECurve, ECurvePoint, ECurveIdentity
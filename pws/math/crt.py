@@ -1,8 +1,81 @@
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Sequence
 
 from pws.math.modinv import modinv
 from pws.math.gcd import gcd
-from pws.math.prod import prod
+
+
+class CRTContext:
+    """
+    Precomputed context for solving many systems of linear congruences x \equiv r_i (mod m_i)
+    over the same `moduli`, using Garner's algorithm.
+
+    The solution is built up one congruence at a time. With L the lcm of the moduli so far,
+    and x the solution so far (mod L), the next congruence x' \equiv r (mod m) is merged as
+
+        g = gcd(L, m)
+        x' = x + L * (((r - x) / g) * (L / g)^-1 mod (m / g))
+
+    which requires r \equiv x (mod g): the system is compatible. For pairwise coprime moduli, g = 1
+    and this is exactly Garner's mixed-radix reconstruction. Everything that only depends on the
+    moduli (the gcds, lcms and inverses) is computed once, on construction, so `solve` only needs
+    a few multiplications per congruence.
+    """
+
+    def __init__(self, moduli: Sequence[int]):
+
+        if not moduli:
+            raise ValueError("At least one modulus is needed.")
+
+        for m in moduli:
+            if m < 1:
+                raise ValueError(f"Invalid modulus {m}. Should be a positive integer.")
+
+        self.moduli = tuple(moduli)
+
+        # Per congruence after the first: (m, g, m / g, L before merging, (L / g)^-1 mod (m / g))
+        self._steps: List[Tuple[int, int, int, int, int]] = []
+
+        L = moduli[0]
+
+        for m in moduli[1:]:
+            g = gcd(L, m)
+            m_g = m // g
+
+            inverse = modinv(L // g, m_g)[0] if m_g > 1 else 0
+
+            self._steps.append((m, g, m_g, L, inverse))
+            L *= m_g
+
+        # The solution is unique mod lcm(moduli).
+        self.modulus = L
+
+        self.pairwise_coprime = all(step[1] == 1 for step in self._steps)
+
+    def solve(self, residues: Sequence[int]) -> Optional[int]:
+        """
+        Find x in range [0, lcm(moduli)), such that x \equiv residues[i] (mod moduli[i]) for every i.
+        Returns None if the system has no solution (only possible if the moduli are not pairwise coprime).
+        """
+
+        if len(residues) != len(self.moduli):
+            raise ValueError(f"Expected {len(self.moduli)} residues, got {len(residues)}.")
+
+        x = residues[0] % self.moduli[0]
+
+        for r, (m, g, m_g, L, inverse) in zip(residues[1:], self._steps):
+            diff = r - x
+
+            if g != 1:
+                if diff % g:
+                    # r \not\equiv x (mod g): incompatible.
+                    return None
+
+                diff //= g
+
+            x += L * (diff * inverse % m_g)
+
+        return x
+
 
 def crt(*system: Tuple[int, int]) -> Optional[Tuple[int, int]]:
         """
@@ -26,46 +99,27 @@ def crt(*system: Tuple[int, int]) -> Optional[Tuple[int, int]]:
 
         }
 
-        with gcd(n_0, n_1, ..., n_k) = 1 (that is: n_0, n_1, ..., n_k are relatively prime)
+        with n_0, n_1, ..., n_k pairwise relatively prime
         AND 0 <= a_j < n_j for every (a_j, n_j),
         
         There exists one, and only one solution x = p such that 0 <= p < \prod_{j=0}^k (n_j)
         AND all solutions x to the system are of the form x \equiv p (mod \prod_{j=0}^k (n_j))
+
+        If the moduli are not pairwise relatively prime, the system may still have a solution:
+        it is then unique modulo the lcm of the moduli. None is returned if the congruences are incompatible.
+
+        To solve many systems with the same moduli, use a `CRTContext`.
         """
         
-       
-        moduli = [congruence[1] for congruence in system]
-        bases  = [congruence[0] for congruence in system]
-        
-        
-        # First perform some checks.
-        
         for congruence in system:
             # If even a single base is greater than the modulus, bail out
             if not (0 <= congruence[0] < congruence[1]):
                 return None
             
-        # If a single argument is supplied, just return it; no further computation needed
-        if len(system) == 1:
-            congruence = system[0]
-            # reduce a_0 mod n_0
-            return (congruence[0] % congruence[1], congruence[1])
-        
+        context = CRTContext([congruence[1] for congruence in system])
+        x = context.solve([congruence[0] for congruence in system])
 
-        # If all the moduli are not relatively prime to eachother, bail out:
-        if gcd(*moduli) != 1:
+        if x is None:
             return None
-        
-                # Now that we are guaranteed a result, let's start by computing the product of the moduli.
-        N = prod(*moduli)
-        N_j = lambda j: N // moduli[j]
-
-        # N_j * m_j \equiv q (mod n_j)
-        m_j = lambda j: modinv(N_j(j), n = moduli[j])[0]
-        
-        # p = \sum_{j=0}^k ( N_j * a_j * m_j)
-        p = sum( N_j(j) * bases[j] * m_j(j) for j in range(len(system)))
-        
-        # Be sure to reduce base mod N.
-        return (p % N, N)
 
+        return (x, context.modulus)
@@ -1,4 +1,6 @@
-from pws.math import modinv, modsqrt
+from typing import List, Sequence, Tuple
+
+from pws.math import modinv, modsqrt, batch_modinv
 
 class ECurvePoint:
     
@@ -138,6 +140,50 @@ class ECurve:
         assert self.is_element(point)
         return point
     
+    def add_many(self, pairs: Sequence[Tuple[ECurvePoint, ECurvePoint]]) -> List[ECurvePoint]:
+        """
+        Compute P + Q for every pair (P, Q) in `pairs`.
+
+        Every addition (or doubling) needs the inverse of its slope's denominator mod p.
+        Here they are all computed at once using `batch_modinv`, so the whole batch
+        costs a single modular inversion instead of one per pair.
+        """
+
+        p = self.modulus
+
+        results: List[ECurvePoint] = [None] * len(pairs)
+
+        # (index, x1, y1, x2, slope numerator) for every pair needing a slope, with its denominator in `denominators`.
+        pending = []
+        denominators = []
+
+        for i, (P, Q) in enumerate(pairs):
+
+            if isinstance(P, ECurveIdentity) or isinstance(Q, ECurveIdentity) or (P.x == Q.x and P.y == (-Q.y % p)):
+                # No slope needed.
+                results[i] = P + Q
+                continue
+
+            x1, y1 = P
+            x2, y2 = Q
+
+            if P != Q:
+                pending.append((i, x1, y1, x2, (y2 - y1) % p))
+                denominators.append(x2 - x1)
+            else:
+                pending.append((i, x1, y1, x2, (3 * pow(x1, 2, p) + self.a) % p))
+                denominators.append(2 * y1)
+
+        for (i, x1, y1, x2, numerator), inverse in zip(pending, batch_modinv(denominators, p)):
+            l = numerator * inverse % p
+
+            x3 = (pow(l, 2, p) - x1 - x2) % p
+            y3 = ((l * (x1 - x3)) - y1) % p
+
+            results[i] = self.point(x3, y3)
+
+        return results
+
     def points_for_x(self, x: int):
         p = self.modulus
         
@@ -1,42 +1,62 @@
 from typing import Tuple
 
+from pws.math.gcd import LEHMER_THRESHOLD, lehmer_step
+
 
 def egcd(a: int, b: int) -> Tuple[int, int, int]:
     """
-    Calculates the Greatest Common Divisor (gcd) of the integers `a`, and `b`. 
+    Calculates the Greatest Common Divisor (gcd) of the integers `a`, and `b`.
     Additionally, calculates the Bézout coefficients `x`, `y` associated with a and b, all using the extended Euclidean algorithm
+
+    The computation is iterative, and uses Lehmer's algorithm for operands of more than `LEHMER_THRESHOLD` bits (see gcd.py).
+    Only the coefficient of `a` is tracked: the other one follows from a * x + b * y = gcd.
+    The gcd is never negative, also for negative `a` or `b`.
     """
-    
+
     swapped = False
     if a < b:
         a, b = b, a
         swapped = True
 
-    def _recurse_egcd(a: int, b: int):
-        """Small stub so the unnecessary compare/swap does not occur for recursion"""
+    if a == b:
+        # gcd(a, a) = |a| = ±1 * a + 0 * a, and gcd(0, 0) = 0
+        if a < 0:
+            return -a, -1, 0
+
+        return (a, 1, 0) if a else (0, 0, 1)
+
+    # Invariant: r0 = x0 * a (mod b), r1 = x1 * a (mod b)
+    r0, r1 = a, b
+    x0, x1 = 1, 0
 
-        # No remainder left.
-        if a == 0:
-            
-            return (b, 0, 1)
+    while r1.bit_length() > LEHMER_THRESHOLD:
+        A, B, C, D = lehmer_step(r0, r1)
 
-        gcd, x_0, y_0 = _recurse_egcd(b % a, a)
-        
-        # Recursively "fill up" bezout coefficients.
-        x = y_0 - (b // a) * x_0
-        y = x_0
-        
-        return (gcd, x, y)
-    
+        if B == 0:
+            q, r = divmod(r0, r1)
+            r0, r1 = r1, r
+            x0, x1 = x1, x0 - q * x1
+        else:
+            # The same matrix applies to the coefficients, as they are updated just like the remainders.
+            r0, r1 = A * r0 + B * r1, C * r0 + D * r1
+            x0, x1 = A * x0 + B * x1, C * x0 + D * x1
 
+    while r1:
+        q, r = divmod(r0, r1)
+        r0, r1 = r1, r
+        x0, x1 = x1, x0 - q * x1
+
+    gcd, x = r0, x0
+    y = (gcd - x * a) // b if b else 0
+
+    # With negative operands, the remainders (and so the gcd) may come out negative.
+    if gcd < 0:
+        gcd, x, y = -gcd, -x, -y
 
-    gcd, x, y =  _recurse_egcd(a, b)
-    
     # If a swap took place previously,
     # we need to swap the associated coefficients as well.
-    
+
     if swapped:
         return gcd, y, x
     else:
         return gcd, x, y
-
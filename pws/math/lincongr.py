@@ -1,4 +1,4 @@
-from typing import Union, Optional, List, Tuple
+from typing import Union, Optional, Iterator, List, Tuple
 
 from pws.math.egcd import egcd # for gcd + bezout coeffs.
 
@@ -7,7 +7,8 @@ def solve_lincongr(a: int, b: int, n: int, simplify: bool=True) -> Optional[ Uni
     Solve a linear congruence a * x \equiv b (mod n)
     
     If `simplify` is set to False, a list of variable length, holding solution tuples (base, mod),
-    which represent a solution `base + mod * k`, with k { Z, is returned
+    which represent a solution `base + mod * k`, with k { Z, is returned.
+    There are gcd(a, n) of them: use `iter_lincongr_solutions` to produce them lazily instead.
     
     If `simplify` is set to True, a single instance of such a solution tuple is returned.
     
@@ -15,20 +16,49 @@ def solve_lincongr(a: int, b: int, n: int, simplify: bool=True) -> Optional[ Uni
 
     """
 
+    reduced = _reduce_lincongr(a, b, n)
+
+    if reduced is None:
+        return None
+
+    bx, gcd_a_n = reduced
+
+    if simplify:
+        return ((bx // gcd_a_n) % n, n // gcd_a_n)
+    else:
+        return list(_iter_solutions(bx, n, gcd_a_n))
+
+
+def iter_lincongr_solutions(a: int, b: int, n: int) -> Iterator[Tuple[int, int]]:
+    """
+    Lazily produce the solution tuples of a * x \equiv b (mod n), as `solve_lincongr(a, b, n, simplify=False)`
+    would return them. Useful when gcd(a, n) is large and only a few solutions are needed.
+
+    If no solution exists, nothing is produced.
+    """
+
+    reduced = _reduce_lincongr(a, b, n)
+
+    if reduced is not None:
+        yield from _iter_solutions(reduced[0], n, reduced[1])
+
+
+def _reduce_lincongr(a: int, b: int, n: int) -> Optional[Tuple[int, int]]:
+    """Return (b * x, gcd(a, n)), with a * x + n * y = gcd(a, n), or None if there are no solutions."""
+
     # Start by reducing a, b mod n
     a %= n
     b %= n
     gcd_a_n, x, y = egcd(a, n)
     
-    if not (b / gcd_a_n).is_integer():
+    if b % gcd_a_n != 0:
         # gcd(a, n) does not evenly divide b. This means there are no solutions
         return None
     
     # all solutions are given by ((bx + nk)/gcd(a, n)) (mod n) with k { [0, gcd(a, n) - 1]
-    
-    bases = [(b*x + n*k) // gcd_a_n for k in range(0, gcd_a_n)] # all (mod n)
-    
-    if simplify:
-        return (bases[0] % n, n // gcd_a_n )
-    else:
-        return [ (b % n, n) for b in bases]
+    return b * x, gcd_a_n
+
+
+def _iter_solutions(bx: int, n: int, gcd_a_n: int) -> Iterator[Tuple[int, int]]:
+    for k in range(0, gcd_a_n):
+        yield ((bx + n * k) // gcd_a_n % n, n)
@@ -1,6 +1,21 @@
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Iterable
+import random
+
+from pws import backend
+from pws.math.egcd import egcd
+from pws.math.gcd import gcd
+
+
+class NotInvertibleError(ValueError):
+    """Raised when an element has no multiplicative inverse mod n: gcd(value, n) != 1."""
+
+    def __init__(self, index: int, value: int, n: int):
+        self.index = index
+        self.value = value
+        self.n = n
+
+        super(NotInvertibleError, self).__init__(f"Element {index} ({value}) is not invertible mod {n}: gcd = {gcd(value, n)}")
 
-from pws.math.lincongr import solve_lincongr
 
 def modinv(a: int, n: int) -> Optional[Tuple[int, int]]:
     """
@@ -9,9 +24,95 @@ def modinv(a: int, n: int) -> Optional[Tuple[int, int]]:
 
     On success, a solution tuple (base, mod), which represents a solution ` base + mod * k`, with k { Z, is returned.
 
-    If no solution is found (that is, gcd(a, n) != n), None is returned
+    If no solution is found (that is, gcd(a, n) != 1), None is returned
 
+    This is the special case b = 1 of `solve_lincongr`, which has at most one solution mod n,
+    so it is computed directly from the extended gcd. The computation is done by the active backend
+    of the `modinv` primitive (see `pws.backend`): the extended gcd by default, or the builtin
+    pow(a, -1, n) ("builtin").
     """
-    
-    return solve_lincongr(a, 1, n, simplify=True)
 
+    if backend.active("modinv") == backend.REFERENCE:
+        return _modinv(a, n)
+
+    return backend.get("modinv")(a, n)
+
+
+def _modinv(a: int, n: int) -> Optional[Tuple[int, int]]:
+    g, x, _ = egcd(a % n, n)
+
+    if g != 1:
+        return None
+
+    return (x % n, n)
+
+
+def _builtin_modinv(a: int, n: int) -> Optional[Tuple[int, int]]:
+    try:
+        return (pow(a, -1, n), n)
+    except ValueError:
+        # Not invertible.
+        return None
+
+
+def _modinv_selftest(impl) -> bool:
+    """Check `impl` against the reference implementation, on invertible and non-invertible pseudo-random values."""
+
+    rng = random.Random(0x5eed)
+
+    cases = [(3, 7), (4, 6), (0, 5), (5, 1), (1, 1)]
+
+    for bits in (8, 64, 1024):
+        n = rng.getrandbits(bits) | 1
+        cases += [(rng.getrandbits(bits + 8), n), (6 * rng.getrandbits(bits), 6 * n)]
+
+    return all(impl(a, n) == _modinv(a, n) for a, n in cases)
+
+
+def batch_modinv(values: Iterable[int], n: int) -> List[int]:
+    """
+    Compute the multiplicative modular inverses of all `values` mod n, using Montgomery's trick:
+    the running products v_0, v_0 * v_1, ..., v_0 * ... * v_{N-1} are computed, and only the last one
+    is inverted. Walking back, every inverse is peeled off with two multiplications:
+
+        v_i^-1 = (v_0 * ... * v_i)^-1 * (v_0 * ... * v_{i-1})
+        (v_0 * ... * v_{i-1})^-1 = (v_0 * ... * v_i)^-1 * v_i
+
+    In total, N values take a single extended gcd and 3(N - 1) multiplications.
+
+    Returns the list of inverses, each in range [0, n).
+    If any of the values is not invertible, a NotInvertibleError is raised, identifying the first such value by its index.
+    """
+
+    values = [v % n for v in values]
+
+    if not values:
+        return []
+
+    prefix = [values[0]]
+
+    for v in values[1:]:
+        prefix.append(prefix[-1] * v % n)
+
+    solution = modinv(prefix[-1], n)
+
+    if solution is None:
+        # The product is not invertible, so (at least) one of the values is not either. Find the first one.
+        for i, v in enumerate(values):
+            if gcd(v, n) != 1:
+                raise NotInvertibleError(i, v, n)
+
+    inverse = solution[0]
+    result = [0] * len(values)
+
+    for i in range(len(values) - 1, 0, -1):
+        result[i] = inverse * prefix[i - 1] % n
+        inverse = inverse * values[i] % n
+
+    result[0] = inverse
+
+    return result
+
+
+backend.register("modinv", backend.REFERENCE, _modinv, selftest=_modinv_selftest)
+backend.register("modinv", "builtin", _builtin_modinv)
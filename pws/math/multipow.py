@@ -0,0 +1,157 @@
+from typing import List, Tuple, Iterable, Dict
+
+from pws.math.pow import window_size
+
+
+# From this many terms on, Pippenger's bucket method beats interleaved windows.
+PIPPENGER_THRESHOLD = 128
+
+
+def _sliding_windows(e: int, k: int) -> List[Tuple[int, int]]:
+    """
+    Split `e` into windows of at most `k` bits that start with a set bit, scanning from the least significant bit.
+    Returns a list of (position, odd value), such that e = sum(value * 2^position).
+    """
+
+    windows = []
+    position = 0
+
+    while e:
+        # Skip the trailing zeros.
+        zeros = (e & -e).bit_length() - 1
+        e >>= zeros
+        position += zeros
+
+        windows.append((position, e & ((1 << k) - 1)))
+
+        e >>= k
+        position += k
+
+    return windows
+
+
+def _straus(terms: List[Tuple[int, int]], n: int) -> int:
+    """
+    Straus' method with interleaved sliding windows: every base gets its own table of odd powers
+    and its own windows, but all terms share the same chain of squarings.
+    """
+
+    # position -> list of (term, odd window value)
+    events: Dict[int, List[Tuple[int, int]]] = {}
+    tables = []
+
+    for t, (base, e) in enumerate(terms):
+        k = window_size(e.bit_length())
+
+        # table[i] = base^(2i + 1)
+        table = [base]
+        base_sqr = base * base % n
+
+        for _ in range((1 << (k - 1)) - 1):
+            table.append(table[-1] * base_sqr % n)
+
+        tables.append(table)
+
+        for position, value in _sliding_windows(e, k):
+            events.setdefault(position, []).append((t, value))
+
+    result = 1
+
+    for position in range(max(events), -1, -1):
+
+        # Squaring 1 is useless, so the first multiplication starts the chain.
+        if result != 1:
+            result = result * result % n
+
+        for t, value in events.get(position, ()):
+            result = result * tables[t][value >> 1] % n
+
+    return result % n
+
+
+def _pippenger(terms: List[Tuple[int, int]], n: int) -> int:
+    """
+    Pippenger's bucket method: per window of `c` exponent bits, every base is multiplied into the bucket
+    of its digit value, after which the buckets are combined as prod_d bucket[d]^d with running products.
+    A window costs one multiplication per term and 2 * 2^c for the buckets, on top of `c` shared squarings.
+    """
+
+    max_bits = max(e.bit_length() for _, e in terms)
+
+    # About log2(#terms) bits per window balances the per-term and the per-bucket cost.
+    c = max(1, len(terms).bit_length() - 2)
+    mask = (1 << c) - 1
+
+    result = 1
+
+    for shift in range(((max_bits - 1) // c) * c, -1, -c):
+
+        if result != 1:
+            for _ in range(c):
+                result = result * result % n
+
+        buckets = [1] * (1 << c)
+
+        for base, e in terms:
+            d = (e >> shift) & mask
+
+            if d:
+                buckets[d] = buckets[d] * base % n
+
+        # prod_d bucket[d]^d = prod_d (prod_{d' >= d} bucket[d'])
+        running, window_result = 1, 1
+
+        for d in range(mask, 0, -1):
+            if buckets[d] != 1:
+                running = running * buckets[d] % n
+
+            if running != 1:
+                window_result = window_result * running % n
+
+        result = result * window_result % n
+
+    return result % n
+
+
+def multi_pow(terms: Iterable[Tuple[int, int]], n: int) -> int:
+    """
+    Calculate the product of `base` raised to `exp` for all (base, exp) in `terms`, mod `n`:
+    e.g. a^x * b^y * c^z mod n for [(a, x), (b, y), (c, z)].
+
+    All exponentiations share a single chain of squarings, so a product of a few powers costs
+    little more than one exponentiation. Up to `PIPPENGER_THRESHOLD` terms, Straus' method with
+    interleaved sliding windows is used; for more terms, Pippenger's bucket method.
+
+    ---------------------------------------------------------------
+    Benchmark, 2048-bit modulus and exponents:
+
+    a^x * b^y mod n:
+        multi_pow: 44.5 ms, two int_pow calls: 76.6 ms
+
+    a^x * b^y * c^z mod n:
+        multi_pow: 54.8 ms, three int_pow calls: 114.8 ms
+
+    512 terms with 256-bit exponents:
+        multi_pow (Pippenger): 0.41 s, Straus: 0.60 s, 512 int_pow calls: 2.46 s
+
+    """
+
+    if n < 1:
+        raise ValueError(f"Invalid modulus {n}. Should be a positive integer.")
+
+    reduced = []
+
+    for base, e in terms:
+        if e < 0:
+            raise ValueError("Invalid operand. Only positive exponents allowed.")
+
+        if e:
+            reduced.append((base % n, e))
+
+    if not reduced:
+        return 1 % n
+
+    if len(reduced) >= PIPPENGER_THRESHOLD:
+        return _pippenger(reduced, n)
+
+    return _straus(reduced, n)
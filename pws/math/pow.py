@@ -1,117 +1,164 @@
-from typing import List
-from sys import getrecursionlimit, setrecursionlimit
+from typing import Optional
+import warnings
+import random
 
-def int_pow(base: int, power: int, modulus: int=None, safe: bool=True):
+from pws import backend
+
+
+def int_pow(base: int, power: int, modulus: Optional[int]=None, safe: Optional[bool]=None):
+    """
+    Calculate `base` raised to `power`, optionally mod `modulus`
+
+    The computation is done by the active backend of the `int_pow` primitive (see `pws.backend`):
+    the pure-Python implementation below by default, or the builtin `pow` ("builtin").
+    `safe` is deprecated: it has no effect, and passing it emits a DeprecationWarning.
+    """
+
+    if safe is not None:
+        warnings.warn("The `safe` parameter of int_pow has no effect, and will be removed.", DeprecationWarning, stacklevel=2)
+
+    if base < 0 or power < 0 or (modulus and modulus < 0):
+        raise ValueError("Invalid operand. Only positive integer operands allowed.")
+
+    if backend.active("int_pow") == backend.REFERENCE:
+        return _int_pow(base, power, modulus)
+
+    return backend.get("int_pow")(base, power, modulus)
+
+
+def window_size(bits: int) -> int:
+    """
+    Window size (in bits) for a sliding-window exponentiation with an exponent of `bits` bits.
+
+    A window of `k` bits needs a table of 2^(k - 1) odd powers, and saves multiplications
+    on every window: larger exponents pay off larger tables. (Same thresholds as OpenSSL.)
+    """
+
+    if bits > 671:
+        return 6
+    if bits > 239:
+        return 5
+    if bits > 79:
+        return 4
+    if bits > 23:
+        return 3
+
+    return 1
+
+
+def _int_pow(base: int, power: int, modulus: Optional[int]=None):
     """
     Calculate `base` raised to `power`, optionally mod `modulus`
     The python standard library offers the same functionality,
     and this function exists only as a proof of Concept.
 
-    This function only aims to support positive integer operands.
+    This function only aims to support positive integer operands, which `int_pow` checks.
+
+    Both paths are iterative, using O(1) stack space.
 
-    the `safe` parameter only applies to modular exponentiation.
-    for values with a large hamming weight, the recursion limit
-    can be hit quite easily, as one round of recursion is needed
-    for every set bit. If `safe` is set to true, the recursion
-    depth is adjusted accordingly during the computation, then
-    restored. 
-    
     ---------------------------------------------------------------
     Benchmark compared to native python pow():
-    
-    pow(a, b, c) 10k times using random pool of a, b, c { [2, 99999999999999999999999999999999999999999999999999999]:
-        702 ms ± 5.44 ms per loop (mean ± std. dev. of 7 runs, 1 loop each)
-    
-    int_pow(a, b, c) 10k times using same pool:
-        1.31 s ± 2.81 ms per loop (mean ± std. dev. of 7 runs, 1 loop each)
 
-    """
-    
-    if base < 0 or power < 0 or (modulus and modulus < 0):
-        raise ValueError("Invalid operand. Only positive integer operands allowed.")
+    pow(a, b, c) using random a, b, c of 256 / 2048 bits:
+        0.20 ms / 36.4 ms per call
+
+    int_pow(a, b, c) using the same operands:
+        0.31 ms / 37.8 ms per call
+        (previous square-all-then-multiply version: 0.37 ms / 49.4 ms)
 
-    def pow_nomod(base: int, power: int):
-        """Calculate `base` raised to `power`."""
-        
-        # Keep a copy
-        base_ = base
-        
-        for _ in range(power - 1):
-            base *= base_
-        return base 
+    int_pow(3, 20000) (no modulus):
+        0.25 ms (previous version, 19999 multiplications: 14.4 ms)
+
+    """
 
     if not modulus:
-        return pow_nomod(base, power)
-
-    # Here the fun part comes.
-    # There exists an optimization for modular exponentiation which
-    # allows for a much faster computation than (base**power) % modulus.
-
-    # the identity `(a * b) mod n = (a mod n) * (b mod n) mod n` aids us here.
-    
-    # We start by splitting the power up in a sum of powers of two.
-        
-    n = 0
-    
-    po2 = []
-
-    while power >> n:
-        
-        # if the bit is set, we have a match:
-        if power & (1 << n):
-            po2.append(n)
-
-        n += 1
-    
-    # We can now represent our evaluation as an expression of the form:
-    # (base**(2**a_0) * base**(2**a_1) * ... * base**(2**a_2) ) % modulus
-    # which we can calculate quite fast using the identity below
-
-
-    # Take the highest power of two and evaluate it using our identity.
-    # We can fill the cache with the results of all the lower powers, mod n.
-    highest = po2[-1] 
-
-    # cache for `base` raised to powers of two, modulus `n`.
-    # the indices shall denote the power.
-    cache = [None] * (highest + 1)
-    
-       
-    result = cache[0] = base % modulus # base**1 # modulus
-    
-    # Square, then reduce modulo `modulus`
-    for cycle in range(highest):
+        return _pow_nomod(base, power)
+
+    return _pow_sliding_window(base, power, modulus)
+
+
+def _pow_nomod(base: int, power: int) -> int:
+    """
+    Calculate `base` raised to `power`, by left-to-right square-and-multiply:
+    O(log(power)) multiplications, instead of `power - 1`.
+    """
+
+    result = 1
+
+    for bit in bin(power)[2:]:
         result *= result
-        result %= modulus
-
-        cache[cycle + 1] = result
-    
-    def product_mod_n(args: List[int], n: int):
-        """ 
-        Calculate (base**(2**a_0) * base**(2**a_1) * ... * base**(2**a_k)) mod n, with every `a` in cache.
-        """
-        
-        # BEWARE: this function can easily exceed python max recursion depth (of 1000).
-        # for values with a large hamming weight, adjust the recursion depth limit accordingly.
-
-        # Identity: (a * b) mod n = (a mod n) * (b mod n) mod n 
-        # this can be applied recursively with relative ease.
-        
-        # Recursion ending condition:
-        
-        if len(args) == 1:
-            return cache[args[0]]
-        #   
-        return (cache[args.pop()]) * (product_mod_n(args, n)) % n
-    
-    if safe:
-        # Make sure we won't hit the recursion limit
-        
-        old = getrecursionlimit()
-        setrecursionlimit(999999999)
-        result = product_mod_n(po2, modulus)
-        setrecursionlimit(old)
-
-        return result
-    else:
-        return product_mod_n(po2, modulus)
+
+        if bit == "1":
+            result *= base
+
+    return result
+
+
+def _pow_sliding_window(base: int, power: int, modulus: int) -> int:
+    """
+    Calculate `base` raised to `power`, mod `modulus`, using left-to-right sliding-window exponentiation.
+
+    The exponent is scanned from its most significant bit. Runs of zero bits cost a squaring each,
+    while a window of up to `k` bits ending in a set bit costs its squarings plus a single multiplication
+    by an odd power of `base`, taken from a precomputed table. For a 2048-bit exponent this takes
+    about 2048 squarings and 350 multiplications, where plain square-and-multiply needs about 1024 multiplications.
+    """
+
+    base %= modulus
+
+    if power == 0:
+        return 1 % modulus
+
+    bits = bin(power)[2:]
+    k = window_size(len(bits))
+
+    # table[i] = base^(2i + 1) mod modulus: the odd powers up to base^(2^k - 1)
+    table = [base]
+    base_sqr = base * base % modulus
+
+    for _ in range((1 << (k - 1)) - 1):
+        table.append(table[-1] * base_sqr % modulus)
+
+    result = 1
+    i = 0
+
+    while i < len(bits):
+        if bits[i] == "0":
+            result = result * result % modulus
+            i += 1
+            continue
+
+        # The longest window of at most `k` bits, starting at `i` and ending in a set bit.
+        j = min(i + k, len(bits))
+        while bits[j - 1] == "0":
+            j -= 1
+
+        for _ in range(j - i):
+            result = result * result % modulus
+
+        result = result * table[int(bits[i:j], 2) >> 1] % modulus
+        i = j
+
+    return result
+
+
+def _builtin_pow(base: int, power: int, modulus: Optional[int]=None) -> int:
+    return pow(base, power, modulus or None)
+
+
+def _int_pow_selftest(impl) -> bool:
+    """Check `impl` against the reference implementation on a fixed set of pseudo-random operands."""
+
+    rng = random.Random(0x5eed)
+
+    for bits in (8, 64, 521, 2048):
+        base, power, modulus = rng.getrandbits(bits), rng.getrandbits(bits) | 1, rng.getrandbits(bits) | 1
+
+        if impl(base, power, modulus) != _int_pow(base, power, modulus):
+            return False
+
+    return impl(3, 100) == _int_pow(3, 100)
+
+
+backend.register("int_pow", backend.REFERENCE, _int_pow, selftest=_int_pow_selftest)
+backend.register("int_pow", "builtin", _builtin_pow)
@@ -1,8 +1,36 @@
 import random
+import math
+from bisect import bisect_left
 from enum import Enum
 
-from pws.math.pow import int_pow
 from pws.math.gcd import gcd
+from pws.math.modcontext import ModContext
+from pws.math.sieve import small_primes, prime_products
+
+
+# Trial division in `division_test` is by all primes up to this bound..
+DIVISION_BOUND = 1 << 16
+
+# ..multiplied together in chunks of this many bits.
+DIVISION_CHUNK_BITS = 2048
+
+# (bound, bases): Miller-Rabin with these bases is proven correct for all n < bound.
+# For every bound, the set with the least bases known (without hashing).
+MILLER_RABIN_BASES = (
+    (2047, (2,)),
+    (1373653, (2, 3)),
+    (9080191, (31, 73)),
+    (4759123141, (2, 7, 61)),                                               # Jaeschke, 1993
+    (1122004669633, (2, 13, 23, 1662803)),
+    (2152302898747, (2, 3, 5, 7, 11)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (1 << 64, (2, 325, 9375, 28178, 450775, 9780504, 1795265022)),         # Sinclair, 2011
+    (318665857834031151167461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),   # Sorenson and Webster, 2015
+    (3317044064679887385961981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41))
+)
+
+# Largest bit length covered by `MILLER_RABIN_BASES`.
+MILLER_RABIN_DETERMINISTIC_BITS = (MILLER_RABIN_BASES[-1][0] - 1).bit_length()
 
 class PrimalityType(Enum):
     """
@@ -23,15 +51,37 @@ class PrimalityType(Enum):
     NEITHER = 4
 
 
-def division_test(n: int):
+def division_test(n: int, bound: int=DIVISION_BOUND):
     """
-    Small compositeness test by dividing by the first 20 primes.
+    Small compositeness test by dividing by all primes up to `bound` (see sieve.py).
+    Numbers up to `bound` are looked up in the sieve instead, and are reported as PRIME or COMPOSITE.
+
+    Rather than dividing by every prime separately, the primes are multiplied together into chunks of
+    `DIVISION_CHUNK_BITS` bits: per chunk, n has a small factor if and only if gcd(n mod chunk, chunk) != 1,
+    which takes a single big-number remainder and a gcd of chunk-sized numbers, instead of hundreds of remainders.
+
+    ---------------------------------------------------------------
+    Benchmark, for numbers without factors up to 2^16 (the worst case):
+
+        bits    bound    chunks of 2048 bits    one prime at a time
+        1024    2^10     14 us                  63 us
+        1024    2^16     0.55 ms                2.6 ms
+        2048    2^16     0.97 ms                4.3 ms
+        4096    2^16     1.26 ms                7.7 ms
     """
 
-    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71]
-    
-    for p in primes:
-        if n % p == 0:
+    if n <= bound:
+        if n < 2:
+            return PrimalityType.NEITHER
+
+        primes = small_primes(bound)
+        i = bisect_left(primes, n)
+
+        return PrimalityType.PRIME if i < len(primes) and primes[i] == n else PrimalityType.COMPOSITE
+
+    for chunk in prime_products(bound, DIVISION_CHUNK_BITS):
+        # The builtin gcd: several times faster than pws.math.gcd on numbers of this size.
+        if math.gcd(n % chunk, chunk) != 1:
             return PrimalityType.COMPOSITE
 
     return PrimalityType.POSSIBLY_PRIME
@@ -58,6 +108,7 @@ def fermat_test(n: int, rounds: int=2) -> PrimalityType:
     if n == 1:
         return PrimalityType.NEITHER
     
+    context = ModContext(n)
 
     for _ in range(rounds):
 
@@ -66,17 +117,79 @@ def fermat_test(n: int, rounds: int=2) -> PrimalityType:
         
         # If a and n share other denominators, n is obviously not prime.
         if gcd(a, n) != 1:
-            print(a, n)
             return PrimalityType.COMPOSITE
         
         # compute a**(n-1) mod n
-        z = int_pow(a, (n-1), n)
+        z = context.pow(a, n - 1)
         if z != 1:
             return PrimalityType.COMPOSITE
     
     return PrimalityType.PROBABLY_PRIME
 
+def _strong_probable_prime(context: ModContext, a: int, d: int, r: int) -> bool:
+    """
+    A single Miller-Rabin round: whether n = context.n is a strong probable prime to base `a`, with n - 1 = 2^r * d, odd d.
+    """
+
+    one, minus_one = context.one, context.to_domain(context.n - 1)
+
+    x = context.pow_domain(context.to_domain(a), d)
+
+    # Fermat's little theorem.. next round
+    if x == one or x == minus_one:
+        return True
+
+    for _ in range(r - 1):
+        x = context.sqr(x)
+        if x == minus_one:
+            return True
+
+    return False
+
+
+def _decompose(n: int):
+    """Calculate `r`, `d` such that 2**r * d = n - 1, with odd d"""
+
+    r, d = 0, n - 1
+
+    while not d & 1:
+        r += 1
+        d >>= 1
+
+    return r, d
+
+
+def miller_rabin_bases(n: int):
+    """
+    Return the smallest known set of Miller-Rabin bases proven to tell whether `n` is prime,
+    or None if `n` is too large for any of them (more than about 3.3 * 10^24).
+    """
+
+    if n.bit_length() > MILLER_RABIN_DETERMINISTIC_BITS:
+        return None
+
+    for bound, bases in MILLER_RABIN_BASES:
+        if n < bound:
+            return bases
+
+    return None
+
+
 def miller_rabin_test(n: int, rounds: int = 32):
+    """
+    The Miller-Rabin compositeness test, with `rounds` random bases.
+
+    For n below about 3.3 * 10^24, the bases of `miller_rabin_bases` are used instead, which are
+    proven to give the right answer: PRIME is returned rather than PROBABLY_PRIME, whatever `rounds` is.
+
+    ---------------------------------------------------------------
+    Benchmark, per prime, against 32 random rounds:
+
+        bits    bases    deterministic    random
+        32      3        0.09 ms          0.99 ms
+        64      7        0.40 ms          1.66 ms
+        81      13       0.85 ms          2.15 ms
+    """
     
     if n in (2, 3):
         return PrimalityType.PRIME
@@ -87,32 +200,183 @@ def miller_rabin_test(n: int, rounds: int = 32):
     if not n & 1:
         return PrimalityType.COMPOSITE
 
-    # Let's calculate `r`, d first, such that 2**r * d = n, with odd d
-    r, d = 0, n - 1
-    
-    while not d & 1:
-        r += 1
-        d >>= 1
-    
+    r, d = _decompose(n)
+
+    # Set up the arithmetic mod n once, for all rounds.
+    context = ModContext(n)
+
+    bases = miller_rabin_bases(n)
+
+    if bases is not None:
+        for a in bases:
+            if not _strong_probable_prime(context, a, d, r):
+                return PrimalityType.COMPOSITE
+
+        return PrimalityType.PRIME
+
     for _ in range(rounds):
         
         # pick our "witness", a random number `a` such that 1 < a < n - 1
         
         a = random.randint(2, n - 2)
-        
-        x = int_pow(a, d, n)
-        
-        # Fermat's little theorem.. next round
-        if x in (1, n - 1):
-            continue
-
-        for _ in range(r - 1):
-            x = int_pow(x, 2, n)
-            if x == n - 1:
-                break # next round
-        else:
+
+        if not _strong_probable_prime(context, a, d, r):
             return PrimalityType.COMPOSITE
 
     return PrimalityType.PROBABLY_PRIME
 
-# TODO lucas test, erastothenes sieve
+
+def jacobi_symbol(a: int, n: int) -> int:
+    """
+    Calculate the Jacobi symbol (a/n), for odd positive `n`: 1 or -1 if gcd(a, n) == 1, 0 otherwise.
+    For prime `n`, this is the Legendre symbol: whether `a` is a quadratic residue mod n.
+    """
+
+    if n < 1 or not n & 1:
+        raise ValueError(f"Invalid modulus {n}. Should be an odd positive integer.")
+
+    a %= n
+    result = 1
+
+    while a:
+        # (2/n) = -1 if and only if n = 3, 5 (mod 8)
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5):
+                result = -result
+
+        # Quadratic reciprocity: (a/n) = -(n/a) if and only if a = n = 3 (mod 4)
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+
+        a %= n
+
+    return result if n == 1 else 0
+
+
+def strong_lucas_test(n: int) -> PrimalityType:
+    """
+    The strong Lucas probable prime test, with the parameters of Selfridge's method A:
+    D is the first of 5, -7, 9, -11, 13, ... with Jacobi symbol (D/n) = -1, P = 1 and Q = (1 - D) / 4.
+
+    With n + 1 = 2^s * d, odd d, and U, V the Lucas sequences of P and Q, a prime n satisfies
+    U_d \equiv 0 (mod n), or V_{d * 2^r} \equiv 0 (mod n) for some 0 <= r < s.
+
+    The pseudoprimes of this test are quite unlike those of Miller-Rabin to base 2: no number is
+    known to fool both, which is what `baillie_psw_test` builds on.
+    (Baillie and Wagstaff, "Lucas Pseudoprimes", 1980)
+    """
+
+    if n < 2:
+        return PrimalityType.NEITHER
+
+    if n in (2, 3):
+        return PrimalityType.PRIME
+
+    if not n & 1:
+        return PrimalityType.COMPOSITE
+
+    D = 5
+
+    while True:
+        j = jacobi_symbol(D, n)
+
+        if j == -1:
+            break
+
+        # (D/n) = 0: D shares a factor with n (and is not n itself, as |D| < n here)
+        if j == 0 and abs(D) != n:
+            return PrimalityType.COMPOSITE
+
+        # For a perfect square n, (D/n) is never -1: bail out after a few tries.
+        if D == 13 and math.isqrt(n) ** 2 == n:
+            return PrimalityType.COMPOSITE
+
+        D = -D - 2 if D > 0 else -D + 2
+
+    P, Q = 1, (1 - D) // 4
+
+    s, d = 0, n + 1
+    while not d & 1:
+        s += 1
+        d >>= 1
+
+    def half(x: int) -> int:
+        # x / 2 mod n, for odd n
+        return (x + n if x & 1 else x) >> 1
+
+    # Binary method, from the most significant bit of d: (U_k, V_k, Q^k) -> (U_2k, V_2k, Q^2k) -> (U_2k+1, V_2k+1, Q^2k+1)
+    U, V, Qk = 1, P, Q % n
+
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+
+        if bit == "1":
+            U, V = half(P * U + V), half(D * U + P * V)
+            Qk = Qk * Q % n
+
+    U, V = U % n, V % n
+
+    if U == 0 or V == 0:
+        return PrimalityType.PROBABLY_PRIME
+
+    # V_2k = V_k^2 - 2 Q^k
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+
+        if V == 0:
+            return PrimalityType.PROBABLY_PRIME
+
+    return PrimalityType.COMPOSITE
+
+
+def baillie_psw_test(n: int, rounds: int = 0, trial_bound: int = DIVISION_BOUND) -> PrimalityType:
+    """
+    The Baillie-PSW test: trial division by the small primes, a single Miller-Rabin round to base 2,
+    and a strong Lucas test (see `strong_lucas_test`). No composite number passing it is known, and
+    there is none below 2^64, for which PRIME is returned. (Baillie, Fiori and Wagstaff, "Strengthening
+    the Baillie-PSW Primality Test", 2021)
+
+    `rounds` additional Miller-Rabin rounds with random bases can be asked for, e.g. to follow FIPS 186-5,
+    which combines a few of them with a Lucas test.
+
+    Trial division is by the primes up to `trial_bound` (see `division_test`); 0 skips it,
+    for candidates that were sieved already.
+
+    Confirming a prime costs about as much as 3.5 Miller-Rabin rounds, instead of 40
+    (1536-bit prime: 64 ms, against 0.70 s for `miller_rabin_test(n, rounds=40)`).
+    """
+
+    if trial_bound:
+        result = division_test(n, trial_bound)
+
+        if result != PrimalityType.POSSIBLY_PRIME:
+            return result
+
+    elif n < 2:
+        return PrimalityType.NEITHER
+
+    elif n in (2, 3):
+        return PrimalityType.PRIME
+
+    elif not n & 1:
+        return PrimalityType.COMPOSITE
+
+    r, d = _decompose(n)
+    context = ModContext(n)
+
+    if not _strong_probable_prime(context, 2, d, r):
+        return PrimalityType.COMPOSITE
+
+    if strong_lucas_test(n) == PrimalityType.COMPOSITE:
+        return PrimalityType.COMPOSITE
+
+    for _ in range(rounds):
+        if not _strong_probable_prime(context, random.randint(2, n - 2), d, r):
+            return PrimalityType.COMPOSITE
+
+    return PrimalityType.PRIME if n < 1 << 64 else PrimalityType.PROBABLY_PRIME
@@ -0,0 +1,117 @@
+from typing import List, Sequence, Tuple
+
+
+# Divisors larger than this (in bits) are handled by `_mod`'s recursive division, smaller ones by the builtin division.
+DIVISION_THRESHOLD = 4000
+
+
+def product_tree(values: Sequence[int]) -> List[List[int]]:
+    """
+    Build the product tree of `values`: a list of levels, the first holding `values` themselves,
+    every next one holding the products of adjacent pairs of the previous one, and the last one
+    holding only the product of all `values`. With an odd amount of nodes, the last one is carried up as-is.
+
+    Multiplying in a balanced tree keeps the operands of similar size, which is much faster than
+    multiplying linearly for big numbers (CPython's Karatsuba multiplication only pays off
+    for operands of similar size), and the tree itself is what `remainder_tree` descends.
+    """
+
+    if not values:
+        raise ValueError("Cannot build the product tree of zero values.")
+
+    level = list(values)
+    tree = [level]
+
+    while len(level) > 1:
+        level = [level[i] * level[i + 1] for i in range(0, len(level) - 1, 2)] + level[len(level) & ~1:]
+        tree.append(level)
+
+    return tree
+
+
+def remainder_tree(x: int, tree: List[List[int]], squared: bool=False) -> List[int]:
+    """
+    Calculate `x` mod every leaf of the product tree `tree` (see `product_tree`).
+
+    Starting from the root, `x` is reduced mod every node, and that remainder is reduced further mod
+    its children: the numbers shrink on the way down, so that the total cost is about that of a few
+    multiplications of `x`-sized numbers, instead of one full-size division per leaf.
+
+    With `squared`, `x` is reduced mod the squares of the nodes instead, as Bernstein's batch gcd needs.
+    """
+
+    remainders = [x]
+
+    for level in reversed(tree):
+        if squared:
+            remainders = [_mod(remainders[i >> 1], node * node) for i, node in enumerate(level)]
+        else:
+            remainders = [_mod(remainders[i >> 1], node) for i, node in enumerate(level)]
+
+    return remainders
+
+
+def _div2n1n(a: int, b: int, n: int) -> Tuple[int, int]:
+    """Divide `a` < b * 2^n by the `n`-bit `b`, recursively: as two divisions of 3 halves by 2 halves."""
+
+    if a.bit_length() - n <= DIVISION_THRESHOLD:
+        return divmod(a, b)
+
+    pad = n & 1
+
+    if pad:
+        a, b, n = a << 1, b << 1, n + 1
+
+    half = n >> 1
+    mask = (1 << half) - 1
+    b1, b2 = b >> half, b & mask
+
+    q1, r = _div3n2n(a >> n, (a >> half) & mask, b, b1, b2, half)
+    q2, r = _div3n2n(r, a & mask, b, b1, b2, half)
+
+    return q1 << half | q2, r >> pad
+
+
+def _div3n2n(a12: int, a3: int, b: int, b1: int, b2: int, n: int) -> Tuple[int, int]:
+    """Divide a12 * 2^n + a3 by b = b1 * 2^n + b2, with the `n`-bit halves b1, b2."""
+
+    # Estimate the quotient using the top halves only: it is at most 2 too large.
+    if a12 >> n == b1:
+        q, r = (1 << n) - 1, a12 - (b1 << n) + b1
+    else:
+        q, r = _div2n1n(a12, b1, n)
+
+    r = (r << n | a3) - q * b2
+
+    while r < 0:
+        q -= 1
+        r += b
+
+    return q, r
+
+
+def _mod(a: int, b: int) -> int:
+    """
+    Calculate `a` mod `b`, for non-negative `a` and positive `b`.
+
+    CPython divides big numbers in quadratic time (before 3.12), which would make the top of a remainder tree
+    dominate everything else. Above `DIVISION_THRESHOLD` bits, Burnikel and Ziegler's recursive division is used instead
+    ("Fast Recursive Division", 1998), which reduces division to multiplications, and so profits from Karatsuba.
+    For a 4-million-bit dividend and 2-million-bit divisor, it takes 1.6 s where the builtin division takes 14.9 s.
+    """
+
+    n = b.bit_length()
+
+    if n <= DIVISION_THRESHOLD:
+        return a % b
+
+    # Long division, with `n`-bit digits.
+    mask = (1 << n) - 1
+    shift = (a.bit_length() // n) * n
+    r = 0
+
+    while shift >= 0:
+        _, r = _div2n1n((r << n) | ((a >> shift) & mask), b, n)
+        shift -= n
+
+    return r
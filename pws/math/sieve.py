@@ -0,0 +1,146 @@
+from typing import Iterator, Tuple
+from itertools import compress
+from math import isqrt
+
+
+# The cached sieve grows (by doubling) up to this many numbers, taking a byte per number.
+# Larger ranges are sieved segment by segment instead.
+CACHE_LIMIT = 1 << 24
+
+# Amount of numbers sieved at once by the segmented sieve.
+SEGMENT_SIZE = 1 << 18
+
+# _sieve[i] == 1 if and only if i is prime, for 0 <= i < len(_sieve).
+_sieve = bytearray()
+
+# _small_primes[bound] = all primes up to `bound`, for the bounds asked for so far.
+_small_primes = {}
+
+# _prime_products[bound, bits] = the result of `prime_products(bound, bits)`.
+_prime_products = {}
+
+
+def _eratosthenes(size: int) -> bytearray:
+    """Sieve of Eratosthenes: flags[i] == 1 if and only if i is prime, for 0 <= i < `size` (at least 2)."""
+
+    flags = bytearray([1]) * size
+    flags[0] = flags[1] = 0
+
+    for p in range(2, isqrt(size - 1) + 1):
+        if flags[p]:
+            # Multiples of p below p^2 have a smaller prime factor, and are already crossed off.
+            flags[p * p::p] = bytes(len(range(p * p, size, p)))
+
+    return flags
+
+
+def _cached_sieve(n: int) -> bytearray:
+    """Return the cached sieve, grown to cover at least 0 <= i <= `n` (`n` < CACHE_LIMIT)."""
+
+    global _sieve
+
+    if len(_sieve) <= n:
+        _sieve = _eratosthenes(min(max(n + 1, 2 * len(_sieve), 1 << 16), CACHE_LIMIT))
+
+    return _sieve
+
+
+def small_primes(bound: int) -> Tuple[int, ...]:
+    """Return all primes up to (and including) `bound`, as a cached tuple. For prime tables used over and over."""
+
+    if bound not in _small_primes:
+        _small_primes[bound] = tuple(primes_up_to(bound))
+
+    return _small_primes[bound]
+
+
+def prime_products(bound: int, bits: int) -> Tuple[int, ...]:
+    """
+    Return all primes up to (and including) `bound`, multiplied together in chunks of at most `bits` bits
+    (or a single prime, for a prime of more bits), as a cached tuple. For trial division by many primes at once.
+    """
+
+    if (bound, bits) not in _prime_products:
+        products = []
+        product = 1
+
+        for p in small_primes(bound):
+            if product > 1 and (product * p).bit_length() > bits:
+                products.append(product)
+                product = 1
+
+            product *= p
+
+        if product > 1:
+            products.append(product)
+
+        _prime_products[bound, bits] = tuple(products)
+
+    return _prime_products[bound, bits]
+
+
+def _sieve_segment(lo: int, hi: int, bound: int) -> bytearray:
+    """
+    Sieve the numbers in [lo, hi) by the primes up to `bound`: flags[i] == 1 if and only if
+    lo + i has no prime factor up to `bound` (other than itself).
+    """
+
+    flags = bytearray([1]) * (hi - lo)
+
+    for p in compress(range(bound + 1), _cached_sieve(bound)[:bound + 1]):
+        # The first multiple of p in range, but not p itself.
+        start = max(p * p, lo + (-lo) % p)
+
+        if start < hi:
+            flags[start - lo::p] = bytes(len(range(start - lo, hi - lo, p)))
+
+    return flags
+
+
+def iter_primes(lo: int, hi: int) -> Iterator[int]:
+    """
+    Yield all primes in [lo, hi), in increasing order.
+
+    Ranges within the cached sieve are read from it directly; others are sieved segment by segment
+    with the primes up to sqrt(hi), so that memory use stays bounded by `SEGMENT_SIZE`, even for
+    ranges far beyond `CACHE_LIMIT` (up to about 2^48).
+    """
+
+    lo = max(lo, 2)
+
+    if hi <= CACHE_LIMIT:
+        if lo < hi:
+            yield from compress(range(lo, hi), _cached_sieve(hi - 1)[lo:hi])
+
+        return
+
+    bound = isqrt(hi - 1)
+
+    if bound >= CACHE_LIMIT:
+        raise ValueError(f"Range too large: sieving up to {hi} needs primes beyond the sieve cache limit.")
+
+    for start in range(lo, hi, SEGMENT_SIZE):
+        end = min(start + SEGMENT_SIZE, hi)
+
+        yield from compress(range(start, end), _sieve_segment(start, end, min(bound, isqrt(end - 1))))
+
+
+def iter_rough(lo: int, hi: int, bound: int) -> Iterator[int]:
+    """
+    Yield the numbers in [lo, hi) without prime factors up to `bound`, with `bound` < lo:
+    what is left of a range of prime candidates after trial division by all small primes at once.
+    """
+
+    if bound >= lo:
+        raise ValueError("The sieving bound should be below the range.")
+
+    for start in range(lo, hi, SEGMENT_SIZE):
+        end = min(start + SEGMENT_SIZE, hi)
+
+        yield from compress(range(start, end), _sieve_segment(start, end, bound))
+
+
+def primes_up_to(n: int) -> Iterator[int]:
+    """Yield all primes up to (and including) `n`, in increasing order."""
+
+    return iter_primes(2, n + 1)
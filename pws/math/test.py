@@ -0,0 +1,425 @@
+from pws.math import gcd, lcm, egcd, int_pow, ModContext, FixedBaseExp, multi_pow
+from pws.math import modinv, batch_modinv, NotInvertibleError
+from pws.math import solve_lincongr, iter_lincongr_solutions
+from pws.math import crt, CRTContext
+from pws.math import product_tree, remainder_tree, prod
+from pws.math import primes_up_to, iter_primes, iter_rough, small_primes, prime_products
+from pws.math.primality_tests import PrimalityType, baillie_psw_test, strong_lucas_test, jacobi_symbol
+from pws.math.primality_tests import miller_rabin_test, miller_rabin_bases, division_test
+from pws.testing import Check, do_checks
+
+from typing import Iterable
+
+import random
+import math
+
+
+def gcd_checks() -> Iterable[Check]:
+    import warnings
+
+    # Sizes on both sides of the Lehmer threshold, and signed operands.
+    for bits in [8, 64, 2048, 5000, 9000]:
+        pairs = [(random.getrandbits(bits) - (1 << (bits - 1)), random.getrandbits(bits)) for _ in range(20)]
+
+        # A large common factor, so that the gcd is not just 1 most of the time.
+        factor = random.getrandbits(bits // 2) | 1
+        pairs += [(a * factor, b * factor) for a, b in pairs[:5]]
+
+        yield f"gcd of {bits}-bit operands against math.gcd", [gcd(a, b) for a, b in pairs], [math.gcd(a, b) for a, b in pairs]
+        yield f"egcd of {bits}-bit operands: gcd and Bezout identity", [
+            (g, a * x + b * y) for a, b in pairs for g, x, y in [egcd(a, b)]
+        ], [(math.gcd(a, b), math.gcd(a, b)) for a, b in pairs]
+
+    values = [random.getrandbits(40) for _ in range(6)]
+    yield "gcd of several operands", gcd(*values), math.gcd(*values)
+    yield "lcm of several operands", lcm(*values), math.lcm(*values)
+
+    yield "egcd with negative operands", [egcd(-3, 5), egcd(3, -5), egcd(-4, -4), egcd(0, 0)], [(1, -2, -1), (1, 2, 1), (4, -1, 0), (0, 0, 1)]
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        gcd(12, 18, safe=True)
+
+    yield "gcd(safe=...) is deprecated", [w.category for w in caught], [DeprecationWarning]
+
+
+def pow_checks() -> Iterable[Check]:
+    from pws import backend
+
+    # Exponents on both sides of every window size threshold, and the edge cases.
+    for bits in [1, 16, 24, 80, 240, 672, 2048]:
+        cases = [(random.getrandbits(bits), random.getrandbits(bits), random.getrandbits(bits) | 1) for _ in range(5)]
+        cases += [(0, 0, 7), (5, 0, 7), (0, 5, 7), (5, 3, 1)]
+
+        for name in backend.available("int_pow"):
+            backend.use("int_pow", name)
+            yield f"int_pow ({name}) of {bits}-bit operands against pow", [int_pow(*case) for case in cases], [pow(*case) for case in cases]
+
+        backend.use("int_pow", backend.REFERENCE)
+
+    yield "int_pow without modulus", [int_pow(3, e) for e in [0, 1, 2, 100, 20000]], [3 ** e for e in [0, 1, 2, 100, 20000]]
+
+
+def modcontext_checks() -> Iterable[Check]:
+    from pws.asymmetric.rsa import generate_keypair
+    from pws.asymmetric.rsa.encrypt import encrypt as rsa_encrypt
+
+    for bits in [5, 64, 1024, 2048]:
+        n = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        cases = [(random.randrange(n), random.getrandbits(bits)) for _ in range(5)] + [(0, 0), (n - 1, 1), (2, n - 1)]
+
+        for method in ModContext.METHODS:
+            context = ModContext(n, method)
+
+            yield f"ModContext ({method}) pow mod a {bits}-bit n against pow", [context.pow(a, e) for a, e in cases], [pow(a, e, n) for a, e in cases]
+            yield f"ModContext ({method}) mul and sqr mod a {bits}-bit n", [
+                context.from_domain(context.mul(context.to_domain(a), context.sqr(context.to_domain(e % n)))) for a, e in cases
+            ], [a * e * e % n for a, e in cases]
+
+    # Opt-in: a context passed to an RSA operation.
+    keypair = generate_keypair(1024)
+    m = b"modular arithmetic"
+    c = rsa_encrypt(m, keypair.pub.e, keypair.pub.n, "oaep", mod_context=ModContext(keypair.pub.n, "montgomery"))
+
+    yield "RSA-OAEP encryption with a Montgomery context", keypair.priv.decrypt(c, "oaep"), m
+
+
+def fixedbase_checks() -> Iterable[Check]:
+
+    for bits, max_bits, window in [(64, 64, 1), (1024, 160, 4), (2048, 2048, 5)]:
+        n = random.getrandbits(bits) | (1 << (bits - 1))
+        g = random.randrange(2, n)
+        exponents = [0, 1, (1 << max_bits) - 1] + [random.getrandbits(max_bits) for _ in range(10)]
+
+        table = FixedBaseExp(g, n, max_bits, window)
+        loaded = FixedBaseExp.from_bytes(table.to_bytes())
+
+        yield f"FixedBaseExp ({max_bits}-bit exponents, {window}-bit window) against pow", [table(e) for e in exponents], [pow(g, e, n) for e in exponents]
+        yield f"FixedBaseExp ({max_bits}-bit exponents, {window}-bit window) after to_bytes/from_bytes", [loaded(e) for e in exponents], [pow(g, e, n) for e in exponents]
+
+    data = table.to_bytes()
+
+    try:
+        FixedBaseExp.from_bytes(data[:40] + bytes([data[40] ^ 1]) + data[41:])
+        corrupted = None
+    except ValueError as e:
+        corrupted = str(e)
+
+    yield "FixedBaseExp.from_bytes rejects a corrupted table", corrupted, "Corrupted FixedBaseExp table: checksum mismatch."
+
+
+def multipow_checks() -> Iterable[Check]:
+    from pws.math.multipow import PIPPENGER_THRESHOLD
+
+    n = random.getrandbits(1024) | (1 << 1023)
+
+    # Straus for a few terms, Pippenger from PIPPENGER_THRESHOLD on.
+    for n_terms, bits in [(1, 1024), (2, 1024), (3, 1024), (PIPPENGER_THRESHOLD - 1, 128), (PIPPENGER_THRESHOLD, 128), (300, 64)]:
+        terms = [(random.randrange(n), random.getrandbits(bits)) for _ in range(n_terms)]
+        terms[0] = (terms[0][0], 0)
+
+        expected = 1
+        for base, exp in terms:
+            expected = expected * pow(base, exp, n) % n
+
+        yield f"multi_pow of {n_terms} terms with {bits}-bit exponents", multi_pow(terms, n), expected
+
+    yield "multi_pow of no terms, and mod 1", [multi_pow([], n), multi_pow([(3, 5)], 1)], [1, 0]
+
+
+def modinv_checks() -> Iterable[Check]:
+    from pws import backend
+
+    p = (1 << 521) - 1
+    n = random.getrandbits(512) | 1
+    values = [random.randrange(1, p) for _ in range(50)]
+    coprime = [v for v in (random.randrange(n) for _ in range(50)) if math.gcd(v, n) == 1]
+
+    for name in backend.available("modinv"):
+        backend.use("modinv", name)
+
+        yield f"modinv ({name}) mod 2^521 - 1 against pow", [modinv(v, p) for v in values], [(pow(v, -1, p), p) for v in values]
+        yield f"modinv ({name}) of non-invertible elements", [modinv(6, 9), modinv(0, 7), modinv(10, 25)], [None, None, None]
+
+    backend.use("modinv", backend.REFERENCE)
+
+    yield "batch_modinv mod 2^521 - 1 against pow", batch_modinv(values, p), [pow(v, -1, p) for v in values]
+    yield "batch_modinv mod a composite against pow", batch_modinv(coprime, n), [pow(v, -1, n) for v in coprime]
+    yield "batch_modinv of one and of no values", [batch_modinv([3], 7), batch_modinv([], 7)], [[5], []]
+
+    try:
+        batch_modinv([3, 6, 5], 9)
+        failed = None
+    except NotInvertibleError as e:
+        failed = (e.index, e.value, e.n)
+
+    yield "batch_modinv reports the first non-invertible value", failed, (0, 3, 9)
+
+
+def lincongr_checks() -> Iterable[Check]:
+    import itertools
+
+    cases = [(a, b, n) for n in [1, 2, 9, 12, 30, 97] for a in range(-n, 2 * n, 5) for b in range(0, n, 2)]
+
+    def brute_force(a, b, n):
+        return [x for x in range(n) if (a * x - b) % n == 0]
+
+    yield "solve_lincongr (simplify=False) against brute force", [
+        sorted(x for x, _ in solve_lincongr(a, b, n, simplify=False) or []) for a, b, n in cases
+    ], [brute_force(a, b, n) for a, b, n in cases]
+
+    def simplified(a, b, n):
+        # The base is only reduced mod n, so compare it mod its step.
+        solution = solve_lincongr(a, b, n)
+        return solution and (solution[0] % solution[1], solution[1])
+
+    yield "solve_lincongr (simplify=True) against brute force", [simplified(a, b, n) for a, b, n in cases], [
+        (xs[0], n // len(xs)) if xs else None for a, b, n in cases for xs in [brute_force(a, b, n)]
+    ]
+
+    yield "iter_lincongr_solutions against solve_lincongr", [
+        list(iter_lincongr_solutions(a, b, n)) for a, b, n in cases
+    ], [solve_lincongr(a, b, n, simplify=False) or [] for a, b, n in cases]
+
+    yield "solve_lincongr (simplify=False) returns a list", type(solve_lincongr(4, 2, 6, simplify=False)), list
+
+    # 2^4000 solutions: only the ones taken are computed.
+    n = 1 << 4001
+    yield "iter_lincongr_solutions is lazy", list(itertools.islice(iter_lincongr_solutions(1 << 4000, 0, n), 3)), [(0, n), (2, n), (4, n)]
+
+
+def crt_checks() -> Iterable[Check]:
+    from pws.asymmetric.rsa.helpers import crt_pow
+    from pws.math.sieve import small_primes
+
+    def brute_force(*system):
+        modulus = lcm(*(n for _, n in system))
+        solutions = [x for x in range(modulus) if all(x % n == a for a, n in system)]
+        return (solutions[0], modulus) if solutions else None
+
+    # Coprime moduli, and moduli sharing factors: compatible or not.
+    systems = [((a, 4), (b, 9), (c, 5)) for a in range(4) for b in range(0, 9, 2) for c in range(0, 5, 3)]
+    systems += [((a, 6), (b, 10), (c, 15)) for a in range(6) for b in range(10) for c in range(0, 15, 4)]
+    systems += [((3, 7),), ((0, 1), (2, 3)), ((1, 8), (5, 12))]
+
+    yield "crt against brute force", [crt(*system) for system in systems], [brute_force(*system) for system in systems]
+    yield "crt with residues out of range", [crt((5, 5)), crt((-1, 5), (1, 3))], [None, None]
+
+    moduli = [random.getrandbits(64) | 1 for _ in range(5)]
+    context = CRTContext(moduli)
+    values = [random.randrange(context.modulus) for _ in range(20)]
+
+    yield "CRTContext solves back its residues", [context.solve([x % m for m in moduli]) for x in values], values
+
+    primes = small_primes(1 << 16)[-4:]
+    context = CRTContext(primes)
+    n = context.modulus
+    cases = [(random.randrange(n), random.randrange(1, n)) for _ in range(20)] + [(0, 5), (1, n - 1)]
+
+    yield "crt_pow with four primes against pow", [crt_pow(b, e, context) for b, e in cases], [pow(b, e, n) for b, e in cases]
+
+
+def prodtree_checks() -> Iterable[Check]:
+    from pws.math.prodtree import DIVISION_THRESHOLD, _mod
+    from pws.asymmetric.rsa import batch_gcd, shared_factors
+
+    for count, bits in [(1, 64), (2, 64), (7, 256), (64, 1024)]:
+        values = [random.getrandbits(bits) | 1 for _ in range(count)]
+        tree = product_tree(values)
+        x = random.getrandbits(bits * count * 2)
+
+        yield f"product_tree of {count} {bits}-bit values", tree[-1], [prod(*values)]
+        yield f"remainder_tree of {count} {bits}-bit values", remainder_tree(x, tree), [x % v for v in values]
+        yield f"remainder_tree (squared) of {count} {bits}-bit values", remainder_tree(x, tree, squared=True), [x % (v * v) for v in values]
+
+    # Divisors above the threshold take the recursive division.
+    cases = [(random.getrandbits(bits * 3), random.getrandbits(bits) | (1 << (bits - 1))) for bits in [DIVISION_THRESHOLD + 1, 3 * DIVISION_THRESHOLD, 20000]]
+    cases += [(b * 12345, b) for _, b in cases] + [(b - 1, b) for _, b in cases]
+
+    yield "recursive division against builtin division", [_mod(a, b) for a, b in cases], [a % b for a, b in cases]
+
+    # RSA-like moduli, some of which share a prime.
+    primes = [random.getrandbits(64) | (1 << 63) | 1 for _ in range(40)]
+    moduli = [primes[i] * primes[i + 1] for i in range(0, 40, 2)]
+    moduli += [primes[0] * primes[3], primes[10] * primes[20], moduli[5]]
+
+    # gcd(N, P / N), the slow way.
+    expected = [math.gcd(n, prod(*moduli[:i], *moduli[i + 1:])) for i, n in enumerate(moduli)]
+
+    yield "batch_gcd against gcd(N, P / N)", batch_gcd(moduli), expected
+    yield "batch_gcd with 3 workers", batch_gcd(moduli, workers=3), expected
+
+    yield "shared_factors against pairwise gcds", shared_factors(moduli), [
+        (i, j, math.gcd(moduli[i], moduli[j])) for i in range(len(moduli)) for j in range(i + 1, len(moduli)) if math.gcd(moduli[i], moduli[j]) != 1
+    ]
+
+
+def sieve_checks() -> Iterable[Check]:
+    from pws.math import sieve
+
+    def smallest_factor(n):
+        return next((p for p in range(2, math.isqrt(n) + 1) if n % p == 0), n)
+
+    def is_prime(n):
+        return n > 1 and smallest_factor(n) == n
+
+    yield "primes_up_to against brute force", list(primes_up_to(5000)), [n for n in range(5001) if is_prime(n)]
+    yield "primes_up_to of small bounds", [list(primes_up_to(n)) for n in range(4)], [[], [], [2], [2, 3]]
+    yield "iter_primes of ranges within the cache", [list(iter_primes(lo, hi)) for lo, hi in [(0, 30), (7, 8), (8, 11), (30, 30), (1000, 1100)]], [
+        [n for n in range(lo, hi) if is_prime(n)] for lo, hi in [(0, 30), (7, 8), (8, 11), (30, 30), (1000, 1100)]
+    ]
+
+    # Beyond the cache limit, segmented; with small segments, so that the range spans several of them.
+    ranges = [(sieve.CACHE_LIMIT - 1000, sieve.CACHE_LIMIT + 3000), (1 << 40, (1 << 40) + 300)]
+    segment_size, sieve.SEGMENT_SIZE = sieve.SEGMENT_SIZE, 1000
+
+    try:
+        segmented = [list(iter_primes(lo, hi)) for lo, hi in ranges]
+        rough = list(iter_rough(sieve.CACHE_LIMIT, sieve.CACHE_LIMIT + 3000, 100))
+    finally:
+        sieve.SEGMENT_SIZE = segment_size
+
+    yield "iter_primes beyond the cache limit, segmented", segmented, [[n for n in range(lo, hi) if is_prime(n)] for lo, hi in ranges]
+    yield "iter_rough against brute force", rough, [n for n in range(sieve.CACHE_LIMIT, sieve.CACHE_LIMIT + 3000) if smallest_factor(n) > 100]
+
+    products = prime_products(1000, 64)
+    yield "prime_products of the small primes", (prod(*products), all(p.bit_length() <= 64 for p in products)), (prod(*small_primes(1000)), True)
+
+
+def _smallest_factor(n: int) -> int:
+    return next((p for p in range(2, math.isqrt(n) + 1) if n % p == 0), n)
+
+
+def _primality(n: int) -> PrimalityType:
+    """The primality of `n`, by brute force."""
+
+    if n < 2:
+        return PrimalityType.NEITHER
+
+    return PrimalityType.PRIME if _smallest_factor(n) == n else PrimalityType.COMPOSITE
+
+
+def bpsw_checks() -> Iterable[Check]:
+    numbers = list(range(-2, 20000)) + [random.getrandbits(40) | 1 for _ in range(200)]
+    expected = [_primality(n) for n in numbers]
+
+    yield "baillie_psw_test against brute force", [baillie_psw_test(n) for n in numbers], expected
+    yield "baillie_psw_test (trial_bound=0) against brute force", [baillie_psw_test(n, trial_bound=0) for n in numbers], expected
+
+    odd = list(range(1, 2000, 2))
+    yield "jacobi_symbol against Euler's criterion mod 1009", [jacobi_symbol(a, 1009) for a in range(1009)], [
+        0 if a == 0 else 1 if pow(a, 504, 1009) == 1 else -1 for a in range(1009)
+    ]
+    yield "strong_lucas_test never rejects a prime", [strong_lucas_test(n) for n in odd if _primality(n) == PrimalityType.PRIME], [
+        PrimalityType.PRIME if n == 3 else PrimalityType.PROBABLY_PRIME for n in odd if _primality(n) == PrimalityType.PRIME
+    ]
+
+    # Strong Lucas pseudoprimes (OEIS A217255), and strong pseudoprimes to base 2 (OEIS A001262).
+    lucas_pseudoprimes = [5459, 5777, 10877, 16109, 18971, 22499, 24569, 25199, 40309, 58519, 75077, 97439, 100127, 113573, 115639, 130139]
+    base2_pseudoprimes = [2047, 3277, 4033, 4681, 8321, 15841, 29341, 42799, 49141, 52633, 65281, 74665, 80581, 85489, 88357, 90751]
+
+    yield "strong_lucas_test passes its pseudoprimes", [strong_lucas_test(n) for n in lucas_pseudoprimes], [PrimalityType.PROBABLY_PRIME] * len(lucas_pseudoprimes)
+    yield "baillie_psw_test rejects strong Lucas pseudoprimes", [
+        baillie_psw_test(n, trial_bound=0) for n in lucas_pseudoprimes
+    ], [PrimalityType.COMPOSITE] * len(lucas_pseudoprimes)
+    yield "baillie_psw_test rejects strong pseudoprimes to base 2", [
+        baillie_psw_test(n, trial_bound=0) for n in base2_pseudoprimes
+    ], [PrimalityType.COMPOSITE] * len(base2_pseudoprimes)
+
+    # 2^p - 1 is prime for these p, and composite for the other primes p in range.
+    mersenne = [61, 89, 107, 127, 521]
+    yield "baillie_psw_test of Mersenne numbers", [baillie_psw_test((1 << p) - 1) != PrimalityType.COMPOSITE for p in small_primes(521) if p > 31], [
+        p in mersenne for p in small_primes(521) if p > 31
+    ]
+    yield "baillie_psw_test of products of two large primes", [
+        baillie_psw_test(((1 << 89) - 1) * ((1 << 107) - 1)), baillie_psw_test(((1 << 61) - 1) ** 2)
+    ], [PrimalityType.COMPOSITE, PrimalityType.COMPOSITE]
+
+
+def miller_rabin_checks() -> Iterable[Check]:
+    from pws.math.primality_tests import MILLER_RABIN_BASES, _strong_probable_prime, _decompose
+
+    # All of these are in the deterministic range: PRIME or COMPOSITE (also for 1).
+    numbers = list(range(1, 20000)) + [random.getrandbits(40) | 1 for _ in range(200)]
+
+    yield "miller_rabin_test against brute force", [miller_rabin_test(n) for n in numbers], [
+        PrimalityType.PRIME if _primality(n) == PrimalityType.PRIME else PrimalityType.COMPOSITE for n in numbers
+    ]
+
+    # Every bound in the table is the smallest strong pseudoprime to its bases (except 2^64), so it takes the next set.
+    pseudoprimes = [(bound, bases) for bound, bases in MILLER_RABIN_BASES if bound != 1 << 64]
+
+    yield "the bounds are strong pseudoprimes to their bases", [
+        all(_strong_probable_prime(ModContext(n), a, _decompose(n)[1], _decompose(n)[0]) for a in bases) for n, bases in pseudoprimes
+    ], [True] * len(pseudoprimes)
+    yield "miller_rabin_test rejects the bounds", [miller_rabin_test(n) for n, _ in pseudoprimes], [PrimalityType.COMPOSITE] * len(pseudoprimes)
+    yield "the first 6 bounds are composite (brute force)", [
+        _smallest_factor(n) < n for n, _ in MILLER_RABIN_BASES[:6]
+    ], [True] * 6
+
+    # The largest primes below 2^64 and 2^81, and 2^89 - 1: beyond the deterministic range.
+    yield "miller_rabin_test of large primes", [miller_rabin_test((1 << 64) - 59), miller_rabin_test((1 << 81) - 51), miller_rabin_test((1 << 89) - 1)], [
+        PrimalityType.PRIME, PrimalityType.PRIME, PrimalityType.PROBABLY_PRIME
+    ]
+    yield "miller_rabin_bases beyond the table", miller_rabin_bases(1 << 82), None
+
+
+def division_checks() -> Iterable[Check]:
+    from pws.math.primality_tests import DIVISION_BOUND
+
+    def expected(n, bound):
+        if n <= bound:
+            return _primality(n)
+
+        return PrimalityType.COMPOSITE if _smallest_factor(n) <= bound else PrimalityType.POSSIBLY_PRIME
+
+    numbers = list(range(-1, 5000))
+    yield "division_test (bound 100) against brute force", [division_test(n, 100) for n in numbers], [expected(n, 100) for n in numbers]
+
+    # Products of a prime just below or just above the bound, and a large prime.
+    large = (1 << 127) - 1
+    primes = list(small_primes(DIVISION_BOUND + 100)[-30:])
+    numbers = [p * large for p in primes] + [p * q for p, q in zip(primes, primes[1:])] + [large, large * large]
+
+    yield "division_test (default bound) of large numbers", [division_test(n) for n in numbers], [
+        PrimalityType.COMPOSITE if min(p for p in primes + [large] if n % p == 0) <= DIVISION_BOUND else PrimalityType.POSSIBLY_PRIME for n in numbers
+    ]
+
+    numbers = range(DIVISION_BOUND - 50, DIVISION_BOUND + 1)
+    yield "division_test (default bound) up to the bound, looked up", [division_test(n) for n in numbers], [_primality(n) for n in numbers]
+
+
+# Checks by name.
+CHECKS = {
+    "gcd": gcd_checks,
+    "pow": pow_checks,
+    "modcontext": modcontext_checks,
+    "fixedbase": fixedbase_checks,
+    "multipow": multipow_checks,
+    "modinv": modinv_checks,
+    "lincongr": lincongr_checks,
+    "crt": crt_checks,
+    "prodtree": prodtree_checks,
+    "sieve": sieve_checks,
+    "bpsw": bpsw_checks,
+    "miller_rabin": miller_rabin_checks,
+    "division": division_checks,
+}
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(
+            description=f"Math Testing module",
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("checks", choices=list(CHECKS) + ["all"], type=str, help="Checks to run.")
+
+    args = parser.parse_args()
+
+    names = list(CHECKS) if args.checks == "all" else [args.checks]
+    results = [do_checks(name, CHECKS[name]()) for name in names]
+
+    sys.exit(0 if all(results) else 1)
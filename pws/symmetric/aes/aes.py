@@ -1,6 +1,6 @@
-from typing import List
-
+from typing import List, NamedTuple, Callable
 
+from pws import backend
 from pws.symmetric.aes.error import AESException
 from pws.symmetric.aes.state import AESState
 
@@ -17,11 +17,29 @@ def _check_params(block: bytes, key: bytes) -> None:
 
     
 
+class AESEngine(NamedTuple):
+    """Implementation of the raw AES block cipher, as registered with `pws.backend` under the "aes" primitive."""
+
+    encrypt: Callable[[bytes, bytes], bytes]
+    decrypt: Callable[[bytes, bytes], bytes]
+
+
 def encrypt_raw(block: bytes, key: bytes) -> bytes:
-    
+    """Encrypt a single 16-byte `block` with `key`, using the active AES backend."""
 
     _check_params(block, key)
 
+    return backend.get("aes").encrypt(block, key)
+
+def decrypt_raw(block: bytes, key: bytes) -> bytes:
+    """Decrypt a single 16-byte `block` with `key`, using the active AES backend."""
+
+    _check_params(block, key)
+
+    return backend.get("aes").decrypt(block, key)
+
+def _encrypt_raw(block: bytes, key: bytes) -> bytes:
+
     round_keys = generate_round_keys(key)
     
     state = AESState(block)
@@ -42,9 +60,7 @@ def encrypt_raw(block: bytes, key: bytes) -> bytes:
     
     return bytes(state.block)
 
-def decrypt_raw(block: bytes, key: bytes) -> bytes:
-    
-    _check_params(block, key)
+def _decrypt_raw(block: bytes, key: bytes) -> bytes:
 
     round_keys = generate_round_keys(key)
 
@@ -66,3 +82,40 @@ def decrypt_raw(block: bytes, key: bytes) -> bytes:
     state.add_round_key(round_keys.pop(-1))
 
     return bytes(state.block)
+
+
+def _aes_selftest(engine: AESEngine) -> bool:
+    """Check `engine` against the reference implementation, for every key size."""
+
+    block = bytes(range(16))
+
+    for key_size in (16, 24, 32):
+        key = bytes(range(0x80, 0x80 + key_size))
+        ciphertext = _encrypt_raw(block, key)
+
+        if engine.encrypt(block, key) != ciphertext or engine.decrypt(ciphertext, key) != block:
+            return False
+
+    return True
+
+
+def _cryptography_engine() -> AESEngine:
+    """AES engine backed by the (optional) `cryptography` package, which uses AES-NI where available."""
+
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    def encrypt(block: bytes, key: bytes) -> bytes:
+        return Cipher(algorithms.AES(key), modes.ECB()).encryptor().update(block)
+
+    def decrypt(block: bytes, key: bytes) -> bytes:
+        return Cipher(algorithms.AES(key), modes.ECB()).decryptor().update(block)
+
+    return AESEngine(encrypt, decrypt)
+
+
+backend.register("aes", backend.REFERENCE, AESEngine(_encrypt_raw, _decrypt_raw), selftest=_aes_selftest)
+
+try:
+    backend.register("aes", "cryptography", _cryptography_engine())
+except ImportError:
+    pass
@@ -0,0 +1,32 @@
+from typing import Any, Iterable, Tuple
+
+
+# (description, our result, expected result)
+Check = Tuple[str, Any, Any]
+
+
+def do_checks(name: str, checks: Iterable[Check]) -> bool:
+    """Run all (description, our result, expected result) `checks`, and print whether they match. Returns whether all did."""
+
+    print(f"[+] {name} checks:")
+    print("-"*80)
+
+    n_checks = n_success = 0
+
+    for description, our, expected in checks:
+        n_checks += 1
+
+        if our == expected:
+            print(f"[+] {description}")
+            n_success += 1
+        else:
+            print(f"[x] {description}:")
+            print(f"{our} <===== this implementation")
+            print(f"{expected} <===== expected")
+
+    print()
+    print("Results:")
+    print("-"*80)
+    print(f"{n_success}/{n_checks} {name} checks passed")
+
+    return n_success == n_checks
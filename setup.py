@@ -4,7 +4,14 @@ requirements = [
     "hexdump"
 ]
 
+# Optional dependencies, e.g. `pip install pws[fast]`
+extras = {
+    # pws.hash.sha256_many
+    "fast": ["numpy"]
+}
+
 setup(name="pws",
         version="1.0",
         install_requires=requirements,
+        extras_require=extras,
         packages=find_packages())